@@ -1,21 +1,33 @@
 from .user_views import UsersAPI, UserProfileAPI
-from .student_views import StudentsAPI, StudentsCreateAPI
-from .teacher_views import TeachersAPI, TeachersCreateAPI
+from .student_views import StudentsAPI, StudentsCreateAPI, StudentsBulkCreateAPI, StudentsExportAPI
+from .teacher_views import TeachersAPI, TeachersCreateAPI, TeachersExportAPI
 from .role_views import RolesAPI, RolesCreateAPI
 from .city_views import CitiesAPI, CitiesCreateAPI
 from .region_views import RegionsAPI, RegionsCreateAPI
+from .photo_views import PhotoRenditionAPI
+from .search_views import SearchAPI
+from .statistics_views import GroupStatisticsAPI
+from .async_views import AsyncStudentsAPI, AsyncTeachersAPI
 
 __all__ = [
     'UsersAPI',
     'UserProfileAPI',
     'StudentsAPI',
     'StudentsCreateAPI',
+    'StudentsBulkCreateAPI',
+    'StudentsExportAPI',
     'TeachersAPI',
     'TeachersCreateAPI',
+    'TeachersExportAPI',
     'RolesAPI',
     'RolesCreateAPI',
     'CitiesAPI',
     'CitiesCreateAPI',
     'RegionsAPI',
     'RegionsCreateAPI',
+    'PhotoRenditionAPI',
+    'SearchAPI',
+    'GroupStatisticsAPI',
+    'AsyncStudentsAPI',
+    'AsyncTeachersAPI',
 ]
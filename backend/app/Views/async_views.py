@@ -0,0 +1,50 @@
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from ..async_api import AsyncAPIView
+from ..conditional import conditional_list
+from ..filters import filter_students
+from ..models import Teacher
+from ..serializers.student_serializers import StudentValuesSerializer
+from ..serializers.teacher_serializers import TeacherValuesSerializer
+from .student_views import StudentsAPI, students_state
+from .teacher_views import teachers_state
+
+
+class AsyncStudentsAPI(AsyncAPIView):
+    """
+    Async-вариант списка студентов для ASGI: те же фильтры, сортировка,
+    пагинация и ответ, что у StudentsAPI, но строки читаются через async ORM.
+    """
+    permission_classes = [IsAuthenticated]
+    paginations = StudentsAPI.paginations
+    get_queryset = StudentsAPI.get_queryset
+    get_pagination = StudentsAPI.get_pagination
+
+    @conditional_list(students_state)
+    async def get(self, request):
+        students, errors = filter_students(self.get_queryset(), request.query_params)
+        pagination = self.get_pagination(request, errors)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if pagination.is_requested(request):
+            page, limit = pagination.get_page_queryset(students, request)
+            rows, next_cursor = pagination.split_page(await StudentValuesSerializer(page).adata(), limit)
+            return Response(
+                pagination.get_paginated_data(request, rows, next_cursor),
+                status=status.HTTP_200_OK,
+            )
+
+        serializer = StudentValuesSerializer(students.order_by(*pagination.ordering))
+        return Response(await serializer.adata(), status=status.HTTP_200_OK)
+
+
+class AsyncTeachersAPI(AsyncAPIView):
+    """Async-вариант списка преподавателей (TeachersAPI)"""
+    permission_classes = [IsAuthenticated]
+
+    @conditional_list(teachers_state)
+    async def get(self, request):
+        serializer = TeacherValuesSerializer(Teacher.objects.all())
+        return Response(await serializer.adata(), status=status.HTTP_200_OK)
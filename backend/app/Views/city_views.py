@@ -2,17 +2,18 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from ..models import City
-from ..serializers.city_serializers import CitySerializer, CityCreateSerializer
+from ..conditional import conditional_list
+from ..reference_data import reference_data
+from ..serializers.city_serializers import CityCreateSerializer
 
 
 class CitiesAPI(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_list(lambda request: reference_data.snapshot().states['cities'])
     def get(self, request):
-        cities = City.objects.all()
-        serializer = CitySerializer(cities, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Справочник отдается из кэша процесса, без запросов к БД
+        return Response(reference_data.snapshot().cities, status=status.HTTP_200_OK)
 
 
 class CitiesCreateAPI(APIView):
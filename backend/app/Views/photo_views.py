@@ -0,0 +1,45 @@
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny
+from ..renditions import RENDITIONS, RENDITION_FORMATS, RENDITION_MODELS, get_rendition, photo_version
+
+# Год: URL содержит версию фото (?v=...), при замене фото он меняется
+RENDITION_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class PhotoRenditionAPI(APIView):
+    """
+    Превью фотографии нужного размера.
+    Файлы фото и так отдаются из MEDIA без авторизации, поэтому и превью публичные.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Accept здесь выбирает формат картинки, а не рендерер DRF
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, model, pk, rendition):
+        if model not in RENDITION_MODELS or rendition not in RENDITIONS:
+            raise Http404
+        photo_name = (
+            apps.get_model(RENDITION_MODELS[model]).objects
+            .filter(pk=pk).values_list('photo', flat=True).first()
+        )
+        if not photo_name:
+            raise Http404
+
+        fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+        path = get_rendition(model, pk, photo_name, rendition, fmt)
+
+        response = FileResponse(default_storage.open(path, 'rb'), content_type=RENDITION_FORMATS[fmt][2])
+        patch_vary_headers(response, ['Accept'])
+        if request.query_params.get('v') == photo_version(photo_name):
+            patch_cache_control(response, public=True, max_age=RENDITION_MAX_AGE, immutable=True)
+        else:
+            # Без версии или со старой версией ссылка может указывать на другое фото
+            patch_cache_control(response, no_cache=True)
+        return response
@@ -2,16 +2,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from ..models import Region
-from ..serializers.region_serializers import RegionSerializer, RegionCreateSerializer
+from ..conditional import conditional_list
+from ..reference_data import reference_data
+from ..serializers.region_serializers import RegionCreateSerializer
 
 class RegionsAPI(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_list(lambda request: reference_data.snapshot().states['regions'])
     def get(self, request):
-        region = Region.objects.all()
-        serializer = RegionSerializer(region, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Справочник отдается из кэша процесса, без запросов к БД
+        return Response(reference_data.snapshot().regions, status=status.HTTP_200_OK)
 
 
 class RegionsCreateAPI(APIView):
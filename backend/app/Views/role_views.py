@@ -2,16 +2,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from ..models import Role
-from ..serializers.role_serializers import RoleSerializer, RoleCreateSerializer
+from ..conditional import conditional_list
+from ..reference_data import reference_data
+from ..serializers.role_serializers import RoleCreateSerializer
 
 class RolesAPI(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_list(lambda request: reference_data.snapshot().states['roles'])
     def get(self, request):
-        roles = Role.objects.all()
-        serializer = RoleSerializer(roles, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Справочник отдается из кэша процесса, без запросов к БД
+        return Response(reference_data.snapshot().roles, status=status.HTTP_200_OK)
 
 
 class RolesCreateAPI(APIView):
@@ -0,0 +1,40 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from ..search import search_people, split_query
+
+SEARCH_TYPES = ('student', 'teacher')
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class SearchAPI(APIView):
+    """
+    Поиск студентов и преподавателей по ФИО с учетом опечаток.
+    Параметры: q - запрос, type=student|teacher (по умолчанию оба), limit (до 100).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        if not split_query(query):
+            return Response({'q': 'Введите хотя бы одно слово из двух букв'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        search_type = request.query_params.get('type')
+        if search_type and search_type not in SEARCH_TYPES:
+            return Response({'type': 'Допустимые значения: student, teacher'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        types = (search_type,) if search_type else SEARCH_TYPES
+
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'limit': 'Должно быть целым числом больше нуля'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'results': search_people(query, types=types, limit=limit)},
+                        status=status.HTTP_200_OK)
@@ -0,0 +1,16 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from ..statistics import get_group_statistics
+
+
+class GroupStatisticsAPI(APIView):
+    """
+    Заполненность активных групп: по группам, специальностям и курсам.
+    Считается одним агрегирующим запросом и кэшируется на минуту.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_group_statistics(), status=status.HTTP_200_OK)
@@ -2,16 +2,64 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from ..models import Student
-from ..serializers.student_serializers import StudentSerializer, StudentCreateSerializer
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from ..models import Student, current_academic_year
+from ..conditional import conditional_list, collection_state
+from ..exports import export_response
+from ..filters import STUDENT_ORDERINGS, DEFAULT_STUDENT_ORDERING, filter_students
+from ..pagination import KeysetPagination
+from ..versions import users_version
+from ..parsers import CSVParser, read_csv_rows
+from ..serializers.student_serializers import (
+    StudentValuesSerializer, StudentCreateSerializer, StudentBulkCreateSerializer
+)
+
+
+def students_state(request):
+    # group - название группы и год начала (курс) в ответе; курс зависит и от учебного года,
+    # логин - от версии пользователей (сигнал при сохранении User)
+    return collection_state(Student, related=['group'], extra=f'{current_academic_year()}|{users_version()}')
 
 
 class StudentsAPI(APIView):
+    """
+    Список студентов.
+    Фильтры: group, speciality, city, role (id, можно несколько через запятую),
+    course (число или римская цифра), is_active (активность группы), search (начало ФИО).
+    Сортировка: ordering=name|-name|lastname|-lastname.
+    """
     permission_classes = [IsAuthenticated]
+    # Порядок совпадает с индексами (is_deleted, name, lastname, id) и lastname, id - для однозначности курсора
+    paginations = {key: KeysetPagination(ordering=ordering) for key, ordering in STUDENT_ORDERINGS.items()}
+
+    def get_queryset(self):
+        # Связи читаются через JOIN в values_list, курс считается в SQL
+        return Student.objects.with_course()
 
+    def get_pagination(self, request, errors):
+        """Пагинация по параметру ordering; недопустимое значение добавляется в errors"""
+        ordering_key = request.query_params.get('ordering') or DEFAULT_STUDENT_ORDERING
+        if ordering_key not in self.paginations:
+            errors['ordering'] = f"Допустимые значения: {', '.join(self.paginations)}"
+            return None
+        return self.paginations[ordering_key]
+
+    @conditional_list(students_state)
     def get(self, request):
-        students = Student.objects.all()
-        serializer = StudentSerializer(students, many=True)
+        students, errors = filter_students(self.get_queryset(), request.query_params)
+        pagination = self.get_pagination(request, errors)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if pagination.is_requested(request):
+            page, limit = pagination.get_page_queryset(students, request)
+            rows, next_cursor = pagination.split_page(StudentValuesSerializer(page).data, limit)
+            return Response(
+                pagination.get_paginated_data(request, rows, next_cursor),
+                status=status.HTTP_200_OK,
+            )
+
+        serializer = StudentValuesSerializer(students.order_by(*pagination.ordering))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -24,6 +72,52 @@ class StudentsCreateAPI(APIView):
             student = serializer.save()
             return Response({
                 'message': 'Студент создан',
-                'student_id': student.id
+                'student_id': student.id,
+                'photo_status': student.photo_status,
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class StudentsBulkCreateAPI(APIView):
+    """
+    Массовое зачисление студентов.
+    Принимает JSON-массив, CSV в теле запроса (text/csv)
+    или CSV-файл в поле "file" (multipart/form-data).
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, CSVParser, MultiPartParser, FormParser]
+
+    def post(self, request):
+        if 'file' in request.FILES:
+            rows = read_csv_rows(request.FILES['file'])
+        else:
+            rows = request.data
+
+        serializer = StudentBulkCreateSerializer(data=rows, many=True)
+        if serializer.is_valid():
+            students = serializer.save()
+            return Response({
+                'message': 'Студенты созданы',
+                'created': len(students),
+                'student_ids': [student.id for student in students],
+            }, status=status.HTTP_201_CREATED)
+        return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class StudentsExportAPI(APIView):
+    """
+    Потоковая выгрузка студентов: output=ndjson (по умолчанию) или output=csv.
+    Принимает те же фильтры, что и список студентов.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in ('ndjson', 'csv'):
+            return Response({'error': 'Параметр output должен быть ndjson или csv'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        students, errors = filter_students(Student.objects.with_course(), request.query_params)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return export_response(StudentValuesSerializer(students.order_by('pk')).iter_data(), output, 'students')
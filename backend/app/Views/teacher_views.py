@@ -2,16 +2,25 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from ..conditional import conditional_list, collection_state
+from ..exports import export_response
 from ..models import Teacher
-from ..serializers.teacher_serializers import TeacherSerializer, TeacherCreateSerializer
+from ..serializers.teacher_serializers import TeacherValuesSerializer, TeacherCreateSerializer
+from ..versions import users_version
+
+
+def teachers_state(request):
+    # Логин в ответе зависит от версии пользователей (сигнал при сохранении User)
+    return collection_state(Teacher, extra=users_version())
 
 
 class TeachersAPI(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_list(teachers_state)
     def get(self, request):
         teachers = Teacher.objects.all()
-        serializer = TeacherSerializer(teachers, many=True)
+        serializer = TeacherValuesSerializer(teachers)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -24,6 +33,21 @@ class TeachersCreateAPI(APIView):
             teacher = serializer.save()
             return Response({
                 'message': 'Преподаватель создан',
-                'teacher_id': teacher.id
+                'teacher_id': teacher.id,
+                'photo_status': teacher.photo_status,
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class TeachersExportAPI(APIView):
+    """Потоковая выгрузка преподавателей: output=ndjson (по умолчанию) или output=csv"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in ('ndjson', 'csv'):
+            return Response({'error': 'Параметр output должен быть ndjson или csv'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        teachers = Teacher.objects.order_by('pk')
+        return export_response(TeacherValuesSerializer(teachers).iter_data(), output, 'teachers')
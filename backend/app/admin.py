@@ -1,7 +1,15 @@
 from django.contrib import admin
+from django.db.models import Q
 from django.utils.safestring import mark_safe
 
 from .models import *
+from .renditions import rendition_urls
+from .search import search_filter, split_query
+
+
+def photo_preview_url(obj):
+    # Превью 160px вместо полного фото: список в админке грузит в десятки раз меньше
+    return rendition_urls(obj._meta.model_name, obj.pk, obj.photo.name)['small']
 
 
 class SoftDeleteAdmin(admin.ModelAdmin):
@@ -50,22 +58,31 @@ class SoftDeleteAdmin(admin.ModelAdmin):
 
     @admin.action(description='↻ Восстановить выбранное')
     def restore_selected(self, request, queryset):
-        """Восстановление мягко удалённых объектов."""
-        count = queryset.filter(is_deleted=True).update(
-            is_deleted=False,
-            deleted_at=None,
-            deleted_by=None,
-        )
+        """Восстановление мягко удалённых объектов (вместе с каскадно удалёнными)."""
+        count = queryset.restore(cascade=True)
         self.message_user(request, f'Восстановлено {count} записей.')
 
     def delete_model(self, request, obj):
         """Переопределяем удаление одного объекта в админке."""
-        obj.delete(deleted_by=request.user)
+        self.model.all_objects.filter(pk=obj.pk).soft_delete(deleted_by=request.user, cascade=True)
 
     def delete_queryset(self, request, queryset):
-        """Переопределяем массовое удаление."""
-        for obj in queryset:
-            obj.delete(deleted_by=request.user)
+        """Переопределяем массовое удаление: один UPDATE вместо сохранения каждой записи."""
+        queryset.soft_delete(deleted_by=request.user, cascade=True)
+
+
+class PeopleSearchAdminMixin:
+    """
+    Поиск в админке через app.search (индекс триграмм по ФИО) вместо цепочки
+    ILIKE '%...%' по search_fields. Логин пользователя ищется точным совпадением.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        words = split_query(search_term)
+        if not words:
+            return super().get_search_results(request, queryset, search_term)
+        condition = search_filter(words) | Q(user__username=search_term.strip())
+        return queryset.filter(condition), False
 
 
 # Обновляем все классы админки, чтобы использовать get_is_deleted_display вместо is_deleted_display
@@ -84,7 +101,7 @@ class CityAdmin(SoftDeleteAdmin):
 
 
 @admin.register(Student)
-class StudentAdmin(SoftDeleteAdmin):
+class StudentAdmin(PeopleSearchAdminMixin, SoftDeleteAdmin):
     search_fields = ['lastname', 'name', 'middlename', 'user__username']
     list_display = ['__str__', 'photo_preview',  'group']
     list_filter = ['group', 'is_deleted'] + SoftDeleteAdmin.list_filter
@@ -93,7 +110,7 @@ class StudentAdmin(SoftDeleteAdmin):
     def photo_preview(self, obj):
         if obj.photo:
             return mark_safe(
-                f'<img src="{obj.photo.url}" style="max-height: 100px; border-radius: 5px;" />'
+                f'<img src="{photo_preview_url(obj)}" style="max-height: 100px; border-radius: 5px;" />'
             )
         return "—"
 
@@ -101,7 +118,7 @@ class StudentAdmin(SoftDeleteAdmin):
 
 
 @admin.register(Teacher)
-class TeacherAdmin(SoftDeleteAdmin):
+class TeacherAdmin(PeopleSearchAdminMixin, SoftDeleteAdmin):
     search_fields = ['lastname', 'name', 'middlename', 'user__username']
     list_display = ['__str__', 'photo_preview']
     list_filter = ['is_deleted'] + SoftDeleteAdmin.list_filter
@@ -111,7 +128,7 @@ class TeacherAdmin(SoftDeleteAdmin):
     def photo_preview(self, obj):
         if obj.photo:
             return mark_safe(
-                f'<img src="{obj.photo.url}" style="max-height: 100px; border-radius: 5px;" />'
+                f'<img src="{photo_preview_url(obj)}" style="max-height: 100px; border-radius: 5px;" />'
             )
         return "—"
 
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class AppConfig(AppConfig):
     name = 'app'
+
+    def ready(self):
+        # Подключаем обработчики сигналов
+        from . import signals  # noqa: F401
+        # Шрифты и шаблон справки готовятся при старте процесса, а не на первом запросе
+        from . import certificates  # noqa: F401
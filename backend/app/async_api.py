@@ -0,0 +1,40 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView с async-обработчиками (async def get ...): DRF сам их не поддерживает.
+    Под ASGI запрос не занимает поток на все время обработки: аутентификация,
+    проверка прав и троттлинг синхронные (могут обращаться к БД) и выполняются
+    через sync_to_async, а обработчик ожидается в цикле событий.
+    Под WSGI такое представление тоже работает - Django запускает его через async_to_sync.
+    """
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # options и http_method_not_allowed у APIView синхронные
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
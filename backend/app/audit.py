@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .authentication import REQUEST_AUTH_ATTR
+
+# Текущий запрос и явно заданный пользователь для полей created_by/updated_by.
+# ContextVar изолирует значения между потоками и asyncio-задачами.
+_audit_request = ContextVar('audit_request', default=None)
+_audit_user = ContextVar('audit_user', default=None)
+
+
+def _request_user(request):
+    # Пользователь из JWT (middleware или DRF), иначе пользователь сессии (админка)
+    jwt_auth = getattr(request, REQUEST_AUTH_ATTR, None)
+    if jwt_auth is not None:
+        return jwt_auth[0]
+    return getattr(request, 'user', None)
+
+
+def get_current_user():
+    """Пользователь, от имени которого сейчас выполняются изменения, или None"""
+    user = _audit_user.get()
+    if user is None:
+        request = _audit_request.get()
+        if request is None:
+            return None
+        user = _request_user(request)
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+@contextmanager
+def audit_request(request):
+    """Делает запрос источником автора изменений на время блока"""
+    token = _audit_request.set(request)
+    try:
+        yield
+    finally:
+        _audit_request.reset(token)
+
+
+@contextmanager
+def audit_user(user):
+    """
+    Явно задает автора изменений вне HTTP-запроса
+    (management-команды, фоновые задачи, тесты).
+    """
+    token = _audit_user.set(user)
+    try:
+        yield
+    finally:
+        _audit_user.reset(token)
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    """
+    Ограниченный по размеру кэш пользователей с временем жизни записей (LRU + TTL).
+    Живет в памяти процесса, поэтому TTL ограничивает, как долго
+    процесс может видеть устаревшие данные пользователя.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                user, expires_at = item
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return user
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, user):
+        with self._lock:
+            self._data[key] = (user, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+            }
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'JWT_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 60),
+)
+
+# Атрибут запроса, в котором middleware оставляет результат проверки токена
+REQUEST_AUTH_ATTR = '_jwt_auth'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без повторной работы:
+    - если токен из куки уже проверил JWTAuthenticationMiddleware, берем его результат;
+    - пользователь по user_id берется из user_cache, а не из auth_user.
+    """
+
+    def authenticate(self, request):
+        django_request = getattr(request, '_request', request)
+        cached = getattr(django_request, REQUEST_AUTH_ATTR, None)
+        if cached is not None:
+            return cached
+        # Невалидная кука не мешает проверить заголовок Authorization
+        result = super().authenticate(request)
+        if result is not None:
+            # Токен из заголовка Authorization: запоминаем для аудита изменений
+            setattr(django_request, REQUEST_AUTH_ATTR, result)
+        return result
+
+    def authenticate_raw_token(self, raw_token):
+        """Проверяет токен и возвращает (user, token) или None, если токен невалиден"""
+        try:
+            validated_token = self.get_validated_token(raw_token)
+            return self.get_user(validated_token), validated_token
+        except (InvalidToken, AuthenticationFailed):
+            return None
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        # В токене id может храниться строкой, ключ кэша всегда строковый
+        user_id = str(user_id)
+        user = user_cache.get(user_id)
+        if user is None:
+            # Неактивные и несуществующие пользователи сюда не попадут: super() бросит исключение
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
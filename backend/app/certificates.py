@@ -0,0 +1,240 @@
+import asyncio
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .models import IssuedCertificate
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+
+# Небольшие пачки быстрее отрисовать в текущем процессе, чем поднимать пул
+POOL_THRESHOLD = 20
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def register_fonts():
+    """Регистрирует шрифты Roboto в ReportLab (один раз на процесс)"""
+    registered = pdfmetrics.getRegisteredFontNames()
+    for name in ('Roboto-Regular', 'Roboto-Bold'):
+        if name not in registered:
+            pdfmetrics.registerFont(TTFont(name, os.path.join(FONTS_DIR, f'{name}.ttf')))
+
+
+register_fonts()
+
+# Справка для военного комиссариата. Поля в фигурных скобках подставляются из certificate_context
+CERTIFICATE_LINES = [
+    'Выдана {full_name}',
+    'в том, что он в {start_of_study} году поступил, имея основное общее образование в ГАПОУ',
+    '"Альметьевский политехнический техникум" по имеющей государственную',
+    'аккредитацию образовательной программы среднего профессионального',
+    'образования {speciality} от 11 ноября 2015 года (бессрочно в',
+    'соответствии с ч.12 ст.92 ФЗ от 29.12.2012г. №273 ФЗ "Об образовании в РФ")',
+    'выданную Министерством образования и науки Республики Татарстан.',
+    '  В настоящее время обучается на {course} курсе по очной форме обучения, по',
+    'специальности среднего профессионального образования {speciality}',
+    '',
+    '  Срок получения образования по образовательной программе среднего',
+    'профессионального образования по очной форме обучения {duration_display}',
+    'Справка выдана для предоставления в военный комиссариат РТ,',
+    'Лениногорский р-н с. Нижняя Чершила',
+]
+
+
+def certificate_students(queryset):
+    """Студенты со всеми связями, нужными для справки, одним запросом"""
+    return queryset.select_related(
+        'group__speciality__code',
+        'group__qualification',
+    ).with_course()
+
+
+def certificate_context(student, issued_at=None, number=None):
+    """
+    Собирает данные справки в обычный словарь.
+    Словарь легко передать в другой процесс, в отличие от экземпляра модели.
+    """
+    issued_at = issued_at or timezone.now()
+    return {
+        'student_id': student.id,
+        'number': number,
+        'date': issued_at.strftime('%d.%m.%Y'),
+        'full_name': str(student),
+        'start_of_study': student.group.start_year,
+        'speciality': str(student.group.speciality),
+        'course': student.course,
+        'duration_display': student.group.qualification.duration_display,
+    }
+
+
+def issue_certificates(students, issued_at=None):
+    """
+    Регистрирует справки в журнале IssuedCertificate и возвращает их данные.
+    Номера выдает последовательность первичного ключа - одним INSERT на всю пачку.
+    """
+    issued_at = issued_at or timezone.now()
+    students = list(students)
+    issued = IssuedCertificate.objects.bulk_create(
+        IssuedCertificate(student=student, issued_at=issued_at) for student in students
+    )
+    return [
+        certificate_context(student, issued_at, number=certificate.pk)
+        for student, certificate in zip(students, issued)
+    ]
+
+
+async def aissue_certificates(students, issued_at=None):
+    return await sync_to_async(issue_certificates)(students, issued_at)
+
+
+def certificate_filename(context):
+    return f"spravka_student_{context['student_id']}.pdf"
+
+
+def certificate_layout():
+    """Строки справки: (шрифт, размер, x, y, текст); {поле} - значение из certificate_context"""
+    width, height = A4
+    x_left = 50
+    y_top = height - 80
+
+    items = [('Roboto-Bold', 16, x_left, y_top, 'СПРАВКА № {number} от {date}')]
+    y = y_top - 40
+    for line in CERTIFICATE_LINES:
+        if line:
+            items.append(('Roboto-Regular', 12, x_left, y, line))
+        y -= 20
+
+    # Подписи
+    y -= 40
+    items.append(('Roboto-Regular', 12, x_left, y, 'Руководитель _______________________'))
+    y -= 20
+    items.append(('Roboto-Regular', 12, x_left, y, 'М.П.'))
+    return items
+
+
+class CertificateTemplate:
+    """
+    Шаблон справки, разобранный один раз при загрузке модуля.
+    Неизменный текст (каждая строка до первого поля) рисуется в form XObject:
+    в PDF он попадает один раз на документ, а страницы ссылаются на него через doForm.
+    На странице рисуются только поля и текст после них, позиции полей вычислены заранее.
+    """
+
+    def __init__(self, name, items):
+        self.name = name
+        self.static = []
+        self.fields = []
+        for font, size, x, y, text in items:
+            prefix, brace, rest = text.partition('{')
+            if prefix:
+                self.static.append((font, size, x, y, prefix))
+            if brace:
+                x += pdfmetrics.stringWidth(prefix, font, size)
+                self.fields.append((font, size, x, y, brace + rest))
+
+    def draw(self, p, context):
+        """Рисует справку на текущей странице; form XObject создается при первом использовании в документе"""
+        if not p.hasForm(self.name):
+            p.beginForm(self.name)
+            for font, size, x, y, text in self.static:
+                p.setFont(font, size)
+                p.drawString(x, y, text)
+            p.endForm()
+        p.doForm(self.name)
+        for font, size, x, y, text in self.fields:
+            p.setFont(font, size)
+            p.drawString(x, y, text.format_map(context))
+
+
+certificate_template = CertificateTemplate('military_office', certificate_layout())
+
+
+def render_certificates_pdf(contexts):
+    """Один PDF-документ, по странице на каждую справку"""
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    for context in contexts:
+        certificate_template.draw(p, context)
+        p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def render_certificate_pdf(context):
+    return render_certificates_pdf([context])
+
+
+def get_executor():
+    """
+    Общий пул процессов для справок из async-представлений (CERTIFICATE_WORKERS процессов).
+    Размер пула ограничивает, сколько справок рисуется одновременно, остальные ждут в очереди.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=max(1, settings.CERTIFICATE_WORKERS))
+        return _executor
+
+
+async def arender_certificate_pdf(context):
+    """render_certificate_pdf вне цикла событий: он не блокируется, пока ReportLab занимает CPU"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), render_certificate_pdf, context)
+
+
+def iter_certificate_pdfs(contexts, max_workers=None):
+    """
+    Отдельный PDF на каждую справку, в порядке contexts.
+    Отрисовка ReportLab упирается в CPU, поэтому большие пачки
+    распределяются по пулу процессов.
+    """
+    contexts = list(contexts)
+    if len(contexts) < POOL_THRESHOLD:
+        for context in contexts:
+            yield context, render_certificate_pdf(context)
+        return
+
+    max_workers = max_workers or min(4, os.cpu_count() or 1)
+    chunksize = max(1, len(contexts) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from zip(contexts, executor.map(render_certificate_pdf, contexts, chunksize=chunksize))
+
+
+class _ZipStreamBuffer:
+    # Файлоподобный объект без seek: zipfile пишет в него, а мы забираем готовые байты
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_certificates_zip(contexts, max_workers=None):
+    """Генератор ZIP-архива со справками, отдаёт данные по мере готовности каждого PDF"""
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for context, pdf in iter_certificate_pdfs(contexts, max_workers=max_workers):
+            archive.writestr(certificate_filename(context), pdf)
+            yield buffer.pop()
+    yield buffer.pop()
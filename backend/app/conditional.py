@@ -0,0 +1,75 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def collection_state(model, related=(), extra=''):
+    """
+    Состояние коллекции одним агрегирующим запросом:
+    max(updated_at) по модели и связанным моделям из related,
+    число всех строк и число неудаленных строк.
+    Возвращает (etag без кавычек, last_modified).
+    """
+    aggregates = {
+        'last': Max('updated_at'),
+        'total': Count('pk'),
+        'active': Count('pk', filter=Q(is_deleted=False)),
+    }
+    for name in related:
+        aggregates[f'{name}_last'] = Max(f'{name}__updated_at')
+    state = model.all_objects.aggregate(**aggregates)
+
+    last_modified = max((value for key, value in state.items() if key.endswith('last') and value),
+                        default=None)
+    raw = '|'.join(f'{key}={value.isoformat() if hasattr(value, "isoformat") else value}'
+                   for key, value in sorted(state.items()))
+    etag = hashlib.md5(f'{model._meta.label}|{raw}|{extra}'.encode('utf-8')).hexdigest()
+    return etag, last_modified
+
+
+def _conditional_response(request, state):
+    """(готовый ответ 304/412 или None, etag, timestamp)"""
+    etag, last_modified = state
+    # Ответ зависит и от параметров запроса (фильтры, курсор)
+    etag = quote_etag(hashlib.md5(f'{etag}|{request.get_full_path()}'.encode('utf-8')).hexdigest())
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp), etag, timestamp
+
+
+def _set_validators(response, etag, timestamp):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def conditional_list(get_state):
+    """
+    Декоратор GET-метода списка: отвечает 304 Not Modified, если коллекция
+    не менялась, не выполняя сам метод (и сериализацию).
+    get_state(request) -> (etag, last_modified).
+    Подходит и для async-методов: get_state тогда выполняется через sync_to_async.
+    """
+    def decorator(method):
+        if iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                response, etag, timestamp = _conditional_response(request, await sync_to_async(get_state)(request))
+                if response is None:
+                    response = await method(self, request, *args, **kwargs)
+                return _set_validators(response, etag, timestamp)
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            response, etag, timestamp = _conditional_response(request, get_state(request))
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            return _set_validators(response, etag, timestamp)
+        return wrapper
+    return decorator
@@ -0,0 +1,165 @@
+import random
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+from .models import (
+    Region, City, Role, CodeSpeciality, Speciality, Qualification, Group, Student, Teacher,
+    current_academic_year,
+)
+
+# Все сгенерированные записи помечены этим префиксом (логины, названия), по нему они и удаляются
+PREFIX = 'ds'
+BATCH_SIZE = 2000
+
+REGIONS = {
+    'Республика Татарстан': ['Казань', 'Набережные Челны', 'Альметьевск', 'Нижнекамск', 'Лениногорск', 'Бугульма'],
+    'Республика Башкортостан': ['Уфа', 'Стерлитамак', 'Октябрьский', 'Туймазы'],
+    'Самарская область': ['Самара', 'Тольятти', 'Сызрань'],
+    'Оренбургская область': ['Оренбург', 'Бугуруслан'],
+    'Удмуртская Республика': ['Ижевск', 'Сарапул'],
+}
+# Коды специальностей начинаются с 99, чтобы не пересечься с настоящими (код уникален)
+SPECIALITIES = [
+    ('99.02.07', 'Информационные системы и программирование', 'Программист'),
+    ('99.02.06', 'Сетевое и системное администрирование', 'Системный администратор'),
+    ('99.02.01', 'Разработка и эксплуатация нефтяных и газовых месторождений', 'Техник-технолог'),
+    ('99.02.12', 'Монтаж и техническое обслуживание промышленного оборудования', 'Техник-механик'),
+    ('99.02.11', 'Техническая эксплуатация электрического оборудования', 'Техник'),
+    ('99.03.01', 'Экономика и бухгалтерский учет', 'Бухгалтер'),
+]
+GROUP_PREFIXES = ['ИС', 'СА', 'РЭ', 'МТ', 'ЭО', 'ЭБ']
+ROLES = ['Студент', 'Староста', 'Преподаватель', 'Куратор']
+
+LASTNAMES = ['Иванов', 'Петров', 'Сидоров', 'Гарипов', 'Хасанов', 'Смирнов', 'Кузнецов', 'Валиев',
+             'Зарипов', 'Николаев', 'Сафин', 'Ахметов', 'Морозов', 'Галиев', 'Волков', 'Шарипов']
+MALE_NAMES = ['Алексей', 'Булат', 'Дмитрий', 'Ильнур', 'Марат', 'Никита', 'Руслан', 'Тимур', 'Артём', 'Айдар']
+FEMALE_NAMES = ['Алина', 'Гульнара', 'Дарья', 'Камила', 'Лейсан', 'Мария', 'Регина', 'Софья', 'Эльвира']
+FATHER_NAMES = ['Сергей', 'Ринат', 'Андрей', 'Ильдар', 'Айрат', 'Олег', 'Рустем', 'Фарит']
+
+
+def _middlename(father, female):
+    # Упрощенно: Сергей -> Сергеевич/Сергеевна, Ринат -> Ринатович/Ринатовна
+    if father.endswith('й'):
+        return father[:-1] + ('евна' if female else 'евич')
+    return father + ('овна' if female else 'ович')
+
+
+def _person(rnd, birth_year):
+    female = rnd.random() < 0.4
+    lastname = rnd.choice(LASTNAMES) + ('а' if female else '')
+    name = rnd.choice(FEMALE_NAMES if female else MALE_NAMES)
+    middlename = _middlename(rnd.choice(FATHER_NAMES), female) if rnd.random() < 0.9 else None
+    return {
+        'lastname': lastname,
+        'name': name,
+        'middlename': middlename,
+        'birth_date': date(birth_year, rnd.randint(1, 12), rnd.randint(1, 28)),
+        'phone': f'+7917{rnd.randint(0, 9999999):07d}',
+    }
+
+
+def _create_users(count, kind, password_hash):
+    return User.objects.bulk_create(
+        (User(username=f'{PREFIX}-{kind}-{i}', password=password_hash) for i in range(count)),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def generate_dataset(students, teachers, seed=0, group_size=25, password='password'):
+    """
+    Детерминированный набор данных: одинаковые параметры и seed дают одинаковые записи.
+    Рассчитан на пустую базу (или после clear_dataset): названия групп могут совпасть с настоящими.
+    Все вставки массовые (bulk_create); пароль хэшируется один раз на всех пользователей.
+    Возвращает словарь с количеством созданных записей.
+    """
+    rnd = random.Random(seed)
+    year = current_academic_year()
+
+    regions = Region.objects.bulk_create(Region(name=f'{PREFIX} {name}') for name in REGIONS)
+    cities = City.objects.bulk_create(
+        City(name=city, region=region)
+        for region, names in zip(regions, REGIONS.values())
+        for city in names
+    )
+    Role.objects.bulk_create(Role(name=f'{PREFIX} {name}') for name in ROLES)
+
+    codes = CodeSpeciality.objects.bulk_create(
+        CodeSpeciality(code=code, description=PREFIX) for code, _, _ in SPECIALITIES
+    )
+    specialities = Speciality.objects.bulk_create(
+        Speciality(code=code, name=name) for code, (_, name, _) in zip(codes, SPECIALITIES)
+    )
+    qualifications = Qualification.objects.bulk_create(
+        Qualification(speciality=speciality, name=qualification, based=based,
+                      duration_months=46 if based == '9' else 34)
+        for speciality, (_, _, qualification) in zip(specialities, SPECIALITIES)
+        for based in ('9', '11')
+    )
+
+    password_hash = make_password(password)
+    teacher_users = _create_users(teachers, 'teacher', password_hash)
+    teacher_objs = Teacher.objects.bulk_create(
+        (Teacher(user=user, **_person(rnd, rnd.randint(1960, 1995))) for user in teacher_users),
+        batch_size=BATCH_SIZE,
+    )
+
+    # Группы по 4 курсам, равномерно по специальностям; название "ИС-23-3" укладывается в 10 символов
+    group_count = max(1, -(-students // group_size))
+    groups = []
+    for i in range(group_count):
+        spec_index = i % len(SPECIALITIES)
+        qualification = qualifications[spec_index * 2 + rnd.randint(0, 1)]
+        start_year = year - i % 4
+        groups.append(Group(
+            name=f'{GROUP_PREFIXES[spec_index]}-{start_year % 100}-{i // len(SPECIALITIES) + 1}',
+            speciality=specialities[spec_index],
+            qualification=qualification,
+            curator=rnd.choice(teacher_objs) if teacher_objs else None,
+            start_year=start_year,
+            end_year=start_year + qualification.duration_months // 12,
+            max_students=group_size + rnd.randint(0, 5),
+        ))
+    groups = Group.objects.bulk_create(groups, batch_size=BATCH_SIZE)
+
+    student_users = _create_users(students, 'student', password_hash)
+    Student.objects.bulk_create(
+        (
+            Student(
+                user=user,
+                group=groups[i // group_size],
+                **_person(rnd, groups[i // group_size].start_year - rnd.randint(15, 17)),
+            )
+            for i, user in enumerate(student_users)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    return {
+        'regions': len(regions),
+        'cities': len(cities),
+        'specialities': len(specialities),
+        'groups': len(groups),
+        'teachers': teachers,
+        'students': students,
+    }
+
+
+def clear_dataset():
+    """Удаляет записи, созданные generate_dataset (в порядке зависимостей)"""
+    users = User.objects.filter(username__startswith=f'{PREFIX}-')
+    Student.all_objects.filter(user__in=users).delete()
+    Group.all_objects.filter(speciality__code__description=PREFIX).delete()
+    Teacher.all_objects.filter(user__in=users).delete()
+    Qualification.all_objects.filter(speciality__code__description=PREFIX).delete()
+    Speciality.all_objects.filter(code__description=PREFIX).delete()
+    CodeSpeciality.all_objects.filter(description=PREFIX).delete()
+    City.all_objects.filter(region__name__startswith=f'{PREFIX} ').delete()
+    Region.all_objects.filter(name__startswith=f'{PREFIX} ').delete()
+    Role.all_objects.filter(name__startswith=f'{PREFIX} ').delete()
+    users.delete()
+
+
+def dataset_exists():
+    return Region.all_objects.filter(name__startswith=f'{PREFIX} ').exists()
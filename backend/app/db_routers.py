@@ -0,0 +1,61 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Реплика, с которой читает текущий запрос (выставляет ReplicaRoutingMiddleware), или None
+_replica = ContextVar('replica', default=None)
+# В этом запросе уже была запись: дальнейшие чтения - только с основной базы
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def replica_aliases():
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    """
+    Разрешает (или запрещает) чтение с реплик внутри блока.
+    Реплика выбирается один раз на блок: ETag и строки одного ответа читаются из одного снимка.
+    """
+    replicas = replica_aliases()
+    token = _replica.set(random.choice(replicas) if enabled and replicas else None)
+    wrote_token = _wrote.set(False)
+    try:
+        yield
+    finally:
+        _wrote.reset(wrote_token)
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Запись всегда в основную базу, чтение - с реплики из REPLICA_DATABASES,
+    только если это разрешено для текущего запроса (безопасный метод без недавней записи).
+    Management-команды, фоновые задачи и транзакции читают с основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica is None or _wrote.get():
+            return DEFAULT_DB_ALIAS
+        # Внутри транзакции нужно видеть ее же изменения
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема на реплики приходит через репликацию
+        return db not in replica_aliases()
@@ -0,0 +1,67 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+# Сколько строк склеивать в один фрагмент ответа
+LINES_PER_CHUNK = 500
+
+
+class _Echo:
+    # csv.writer пишет строку в "файл", а мы сразу забираем результат
+    def write(self, value):
+        return value
+
+
+def flatten(row, prefix=''):
+    """{'user': {'id': 1}} -> {'user.id': 1} для плоского CSV"""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def _chunked(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= LINES_PER_CHUNK:
+            yield ''.join(chunk).encode('utf-8')
+            chunk = []
+    if chunk:
+        yield ''.join(chunk).encode('utf-8')
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    header = None
+    for row in rows:
+        row = flatten(row)
+        if header is None:
+            header = list(row)
+            # BOM, чтобы Excel открыл UTF-8 с кириллицей
+            yield '\ufeff' + writer.writerow(header)
+        yield writer.writerow(['' if row[key] is None else row[key] for key in header])
+
+
+def export_response(rows, output, filename):
+    """
+    Потоковый ответ с выгрузкой в NDJSON или CSV.
+    rows - итератор словарей (ValuesSerializer.iter_data), в памяти держится одна порция.
+    """
+    if output == 'csv':
+        content_type, lines, extension = 'text/csv; charset=utf-8', iter_csv(rows), 'csv'
+    else:
+        content_type, lines, extension = 'application/x-ndjson; charset=utf-8', iter_ndjson(rows), 'ndjson'
+
+    response = StreamingHttpResponse(_chunked(lines), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
@@ -0,0 +1,98 @@
+from django.db.models import Q
+
+from .models import current_academic_year, parse_course
+
+# Разрешенные значения ?ordering= и соответствующий порядок (с id для однозначности курсора).
+# Каждый вариант читается по индексу: (name, lastname, id) или lastname
+STUDENT_ORDERINGS = {
+    'name': ('name', 'lastname', 'id'),
+    '-name': ('-name', '-lastname', '-id'),
+    'lastname': ('lastname', 'name', 'id'),
+    '-lastname': ('-lastname', '-name', '-id'),
+}
+DEFAULT_STUDENT_ORDERING = 'name'
+
+TRUE_VALUES = {'1', 'true', 'yes'}
+FALSE_VALUES = {'0', 'false', 'no'}
+
+
+def parse_ids(raw):
+    """'1,2,3' -> [1, 2, 3] или None, если есть не число"""
+    try:
+        return [int(part) for part in raw.split(',') if part.strip()]
+    except ValueError:
+        return None
+
+
+def parse_bool(raw):
+    value = raw.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+
+def name_prefix_filter(raw):
+    """
+    Поиск по началу ФИО.
+    LIKE 'префикс%' (startswith) читается по индексам lastname/name
+    (на PostgreSQL у них есть *_like индекс с varchar_pattern_ops),
+    поэтому регистр не игнорируется, а первая буква слова делается заглавной.
+    "Иван" ищет по фамилии или имени, "Иванов Пе" - фамилия и начало имени.
+    """
+    words = [word[:1].upper() + word[1:] for word in raw.split()]
+    if not words:
+        return Q()
+    if len(words) == 1:
+        return Q(lastname__startswith=words[0]) | Q(name__startswith=words[0])
+    return Q(lastname__startswith=words[0], name__startswith=words[1])
+
+
+def filter_students(queryset, params):
+    """
+    Фильтры списка студентов из query-параметров.
+    Возвращает (queryset, errors); errors - словарь для ответа 400.
+    Условия по группе ставятся на внешние ключи и поля group, без вычисляемых выражений,
+    чтобы планировщик мог использовать индексы.
+    """
+    errors = {}
+
+    for param, lookup in (
+        ('group', 'group_id__in'),
+        ('speciality', 'group__speciality_id__in'),
+        ('city', 'city_id__in'),
+        ('role', 'role_id__in'),
+    ):
+        raw = params.get(param)
+        if not raw:
+            continue
+        ids = parse_ids(raw)
+        if not ids:
+            errors[param] = 'Укажите id числом или несколько через запятую'
+            continue
+        queryset = queryset.filter(**{lookup: ids})
+
+    course = params.get('course')
+    if course:
+        course_number = parse_course(course)
+        if course_number is None:
+            errors['course'] = 'Укажите курс числом или римской цифрой'
+        else:
+            # Курс N - группы, начавшие обучение N-1 лет назад (индекс group.start_year)
+            queryset = queryset.filter(group__start_year=current_academic_year() + 1 - course_number)
+
+    is_active = params.get('is_active')
+    if is_active:
+        value = parse_bool(is_active)
+        if value is None:
+            errors['is_active'] = 'Укажите true или false'
+        else:
+            queryset = queryset.filter(group__is_active=value)
+
+    search = params.get('search')
+    if search:
+        queryset = queryset.filter(name_prefix_filter(search))
+
+    return queryset, errors
+
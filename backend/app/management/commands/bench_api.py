@@ -0,0 +1,166 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from app.datasets import dataset_exists, generate_dataset
+from app.metrics import collect_metrics
+from app.models import Group, Student
+from app.reference_data import bump_version, reference_data
+from app.statistics import invalidate_group_statistics
+
+
+def endpoints():
+    """(имя, URL, параметры) всех читающих эндпоинтов API; id берутся из сгенерированных данных"""
+    student = Student.objects.order_by('pk').first()
+    group = Group.objects.order_by('pk').first()
+    return [
+        ('users', reverse('user-api'), {}),
+        ('students', reverse('students-api'), {}),
+        ('students_page', reverse('students-api'), {'limit': 50}),
+        ('students_filtered', reverse('students-api'), {'group': group.pk, 'ordering': 'lastname'}),
+        ('students_search', reverse('students-api'), {'search': 'Иван', 'limit': 50}),
+        ('students_export', reverse('students-export-api'), {'output': 'csv'}),
+        ('teachers', reverse('teachers-api'), {}),
+        ('teachers_export', reverse('teachers-export-api'), {}),
+        ('regions', reverse('regions-api'), {}),
+        ('cities', reverse('cities-api'), {}),
+        ('roles', reverse('roles-api'), {}),
+        ('search', reverse('search-api'), {'q': 'Хасанов Тимур'}),
+        ('group_statistics', reverse('group-statistics-api'), {}),
+        ('certificate', reverse('student-certificate', args=[student.pk]), {}),
+        ('certificates_group', reverse('students-certificates'), {'group': group.pk, 'output': 'pdf'}),
+    ]
+
+
+def allowed_host():
+    # Тестовый клиент по умолчанию шлет Host: testserver, а его нет в ALLOWED_HOSTS
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный прогон всех читающих эндпоинтов API на наборах данных разного размера. '
+            'Пишет задержку, число SQL-запросов и пик памяти в JSON и сравнивает с базовой линией. '
+            'Данные создаются во временной транзакции и откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000', help='Количества студентов через запятую')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов каждого запроса (берется медиана)')
+        parser.add_argument('--output', help='Куда записать результаты (JSON)')
+        parser.add_argument('--baseline', help='Базовая линия (JSON) для сравнения')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Допустимое ухудшение задержки и памяти (0.25 = 25%%)')
+        parser.add_argument('--latency-slack', type=float, default=5.0,
+                            help='Ухудшение задержки меньше стольких мс не считается (шум измерений)')
+
+    def measure(self, client, url, params, repeat):
+        def request():
+            response = client.get(url, params)
+            if response.status_code != 200:
+                raise CommandError(f'{url}: код ответа {response.status_code}')
+            # Потоковые ответы (выгрузки, ZIP) нужно дочитать
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            return response
+
+        request()  # Прогрев: кэши справочников, статистики, шрифты
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            request()
+            timings.append(time.perf_counter() - start)
+
+        with collect_metrics() as metrics:
+            request()
+
+        tracemalloc.start()
+        try:
+            request()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'latency_ms': round(statistics.median(timings) * 1000, 2),
+            'queries': metrics.queries,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def run_size(self, size, repeat):
+        with transaction.atomic():
+            generate_dataset(students=size, teachers=max(10, size // 20), seed=0)
+            admin = User.objects.create_superuser('bench-api-admin', password=None)
+            client = APIClient(HTTP_HOST=allowed_host())
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+
+            results = {}
+            for name, url, params in endpoints():
+                results[name] = self.measure(client, url, params, repeat)
+                row = results[name]
+                self.stdout.write(
+                    f"  {name:<20} {row['latency_ms']:9.1f} мс  {row['queries']:4} SQL  "
+                    f"{row['peak_memory_kb']:10.1f} КБ"
+                )
+            transaction.set_rollback(True)
+
+        # Кэши могли запомнить откаченные данные
+        bump_version()
+        reference_data.clear()
+        invalidate_group_statistics()
+        return results
+
+    def compare(self, results, baseline, threshold, latency_slack=0.0):
+        """Список ухудшений относительно базовой линии"""
+        regressions = []
+        for size, endpoints_results in results.items():
+            for name, row in endpoints_results.items():
+                base = baseline.get(size, {}).get(name)
+                if base is None:
+                    continue
+                if row['queries'] > base['queries']:
+                    regressions.append(f"{size}/{name}: SQL-запросов {base['queries']} -> {row['queries']}")
+                for key, label, slack in (('latency_ms', 'задержка', latency_slack),
+                                          ('peak_memory_kb', 'память', 0.0)):
+                    if row[key] > base[key] * (1 + threshold) and row[key] - base[key] > slack:
+                        regressions.append(f'{size}/{name}: {label} {base[key]} -> {row[key]}')
+        return regressions
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes: укажите числа через запятую')
+        if dataset_exists():
+            raise CommandError('В базе уже есть сгенерированные данные, удалите их: '
+                               'manage.py shell -c "from app.datasets import clear_dataset; clear_dataset()"')
+
+        results = {}
+        for size in sizes:
+            self.stdout.write(f'Студентов: {size}')
+            results[str(size)] = self.run_size(size, options['repeat'])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+            self.stdout.write(f"Результаты записаны в {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = self.compare(results, baseline, options['threshold'], options['latency_slack'])
+            if regressions:
+                raise CommandError('Ухудшения относительно базовой линии:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('Ухудшений относительно базовой линии нет'))
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from app.certificates import certificate_context
+from app.models import Student
+
+BENCH_USERNAME = 'bench-asgi-admin'
+
+
+def scenarios():
+    """(имя, синхронный URL для WSGI, async-URL для ASGI, параметры)"""
+    student_id = Student.objects.order_by('pk').values_list('pk', flat=True).first()
+    return [
+        ('students_page', reverse('students-api'), reverse('students-async-api'), {'limit': 50}),
+        ('teachers', reverse('teachers-api'), reverse('teachers-async-api'), {}),
+        ('certificate', reverse('student-certificate', args=[student_id]),
+         reverse('student-certificate-async', args=[student_id]), {}),
+    ]
+
+
+def unnumbered_certificates(students, issued_at=None):
+    # Замена issue_certificates: справка рисуется, но в журнал не пишется и номер не расходуется
+    return [certificate_context(student, issued_at, number=0) for student in students]
+
+
+async def aunnumbered_certificates(students, issued_at=None):
+    return unnumbered_certificates(students, issued_at)
+
+
+def skip_certificate_journal():
+    """Сценарий certificate меряет отрисовку, а не выдачу: без строк IssuedCertificate"""
+    stack = ExitStack()
+    stack.enter_context(mock.patch('app.views.issue_certificates', unnumbered_certificates))
+    stack.enter_context(mock.patch('app.views.aissue_certificates', aunnumbered_certificates))
+    return stack
+
+
+def summary(timings, elapsed):
+    timings = sorted(timings)
+    return {
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(statistics.median(timings) * 1000, 1),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1] * 1000, 1),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Пропускная способность WSGI (поток на запрос, пул --threads потоков) против ASGI '
+            '(async-представления в одном цикле событий) при --concurrency одновременных запросов. '
+            'Справки рисуются без записи в журнал выданных справок. '
+            'Запросы идут через обработчики Django в этом же процессе, без сети; '
+            'нужны данные в базе (manage.py generate_dataset).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Запросов на сценарий')
+        parser.add_argument('--concurrency', type=int, default=50, help='Одновременных запросов')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Потоков WSGI-сервера (как --threads у gunicorn)')
+        parser.add_argument('--output', help='Куда записать результаты (JSON)')
+
+    def run_wsgi(self, url, params, headers, options):
+        local = threading.local()
+
+        def request():
+            # Client не потокобезопасен: у каждого потока свой, как у воркера сервера
+            if not hasattr(local, 'client'):
+                local.client = Client(**headers)
+            start = time.perf_counter()
+            response = local.client.get(url, params)
+            if response.status_code != 200:
+                raise CommandError(f'{url}: код ответа {response.status_code}')
+            if response.streaming:
+                b''.join(response.streaming_content)
+            close_old_connections()
+            return time.perf_counter() - start
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(options['threads'], options['concurrency'])) as executor:
+            timings = list(executor.map(lambda _: request(), range(options['requests'])))
+        return summary(timings, time.perf_counter() - started)
+
+    async def run_asgi(self, url, params, headers, options):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, params, headers=headers)
+                if response.status_code != 200:
+                    raise CommandError(f'{url}: код ответа {response.status_code}')
+                if response.streaming:
+                    response.getvalue()
+                return time.perf_counter() - start
+
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(request() for _ in range(options['requests'])))
+        return summary(timings, time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        if not Student.objects.exists():
+            raise CommandError('В базе нет студентов, сначала выполните manage.py generate_dataset')
+
+        admin = User.objects.create_superuser(BENCH_USERNAME, password=None)
+        token = str(RefreshToken.for_user(admin).access_token)
+        results = {}
+        try:
+            # Тестовые клиенты шлют Host: testserver
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), \
+                    skip_certificate_journal():
+                for name, sync_url, async_url, params in scenarios():
+                    wsgi = self.run_wsgi(sync_url, params, {'HTTP_AUTHORIZATION': f'Bearer {token}'}, options)
+                    asgi = asyncio.run(
+                        self.run_asgi(async_url, params, {'Authorization': f'Bearer {token}'}, options)
+                    )
+                    results[name] = {'wsgi': wsgi, 'asgi': asgi}
+                    self.stdout.write(
+                        f"{name:<14} WSGI: {wsgi['rps']:7.1f} запр/с (p95 {wsgi['p95_ms']:7.1f} мс)   "
+                        f"ASGI: {asgi['rps']:7.1f} запр/с (p95 {asgi['p95_ms']:7.1f} мс)"
+                    )
+        finally:
+            admin.delete()
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+            self.stdout.write(f"Результаты записаны в {options['output']}")
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from app.models import Role
+
+
+def legacy_save(obj):
+    # Прежняя реализация BaseModel.save: get_user() без запроса всегда
+    # бросает исключение, после чего выполняется обычное сохранение
+    try:
+        from django.contrib.auth import get_user
+
+        get_user()
+        models.Model.save(obj)
+    except Exception:
+        models.Model.save(obj)
+
+
+class Command(BaseCommand):
+    help = 'Микро-бенчмарк стоимости BaseModel.save: прежняя реализация и текущая'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=2000, help='Количество сохранений')
+
+    def measure(self, save, count):
+        with transaction.atomic():
+            role = Role.objects.create(name='bench-role')
+            start = time.perf_counter()
+            for i in range(count):
+                role.name = f'bench-role-{i}'
+                save(role)
+            elapsed = time.perf_counter() - start
+            # Ничего не оставляем в базе
+            transaction.set_rollback(True)
+        return elapsed / count * 1e6
+
+    def handle(self, *args, **options):
+        count = options['count']
+        before = self.measure(legacy_save, count)
+        after = self.measure(lambda obj: obj.save(), count)
+        self.stdout.write(f'Сохранений: {count}')
+        self.stdout.write(f'До (исключение + повтор): {before:.1f} мкс/сохранение')
+        self.stdout.write(f'После (contextvar):        {after:.1f} мкс/сохранение')
+        self.stdout.write(f'Разница: {before - after:.1f} мкс ({(1 - after / before) * 100:.0f}%)')
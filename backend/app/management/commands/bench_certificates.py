@@ -0,0 +1,76 @@
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.certificates import certificate_context, certificate_layout, certificate_students, render_certificates_pdf
+from app.models import Student
+
+LAYOUT = certificate_layout()
+
+
+def render_inline_pdf(contexts):
+    """Прежняя отрисовка: весь текст справки заново на каждой странице, без form XObject"""
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    for context in contexts:
+        for font, size, x, y, text in LAYOUT:
+            p.setFont(font, size)
+            p.drawString(x, y, text.format_map(context))
+        p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def cpu_ms(render, contexts, repeat):
+    """Лучшее из repeat процессорное время отрисовки, мс"""
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        pdf = render(contexts)
+        timings.append(time.process_time() - start)
+    return round(min(timings) * 1000, 2), len(pdf)
+
+
+class Command(BaseCommand):
+    help = ('Процессорное время отрисовки справок: прежняя построчная отрисовка против шаблона '
+            'с неизменным текстом в form XObject. Меряет одиночную справку и общий PDF на --batch страниц. '
+            'Нужны данные в базе (manage.py generate_dataset); номера в журнал не записываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=100, help='Страниц в общем PDF')
+        parser.add_argument('--repeat', type=int, default=20, help='Повторов, берется лучший')
+        parser.add_argument('--output', help='Куда записать результаты (JSON)')
+
+    def handle(self, *args, **options):
+        students = list(certificate_students(Student.objects).order_by('pk')[:options['batch']])
+        if not students:
+            raise CommandError('В базе нет студентов, сначала выполните manage.py generate_dataset')
+        contexts = [certificate_context(student, number=index) for index, student in enumerate(students, 1)]
+
+        results = {}
+        for name, sample in (('single', contexts[:1]), ('batch', contexts)):
+            inline_ms, inline_size = cpu_ms(render_inline_pdf, sample, options['repeat'])
+            template_ms, template_size = cpu_ms(render_certificates_pdf, sample, options['repeat'])
+            results[name] = {
+                'pages': len(sample),
+                'inline_ms': inline_ms,
+                'template_ms': template_ms,
+                'inline_per_page_ms': round(inline_ms / len(sample), 3),
+                'template_per_page_ms': round(template_ms / len(sample), 3),
+                'inline_bytes': inline_size,
+                'template_bytes': template_size,
+            }
+            self.stdout.write(
+                f'{name:<7} {len(sample):4} стр.   построчно: {inline_ms:8.2f} мс ({inline_size} байт)   '
+                f'шаблон: {template_ms:8.2f} мс ({template_size} байт)   '
+                f'CPU: {(template_ms / inline_ms - 1) * 100:+.0f}%'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+            self.stdout.write(f"Результаты записаны в {options['output']}")
@@ -0,0 +1,142 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from app.models import Student
+
+BENCH_USERNAME = 'bench-connections-admin'
+
+
+def is_psycopg3():
+    # Пул подключений Django есть только с psycopg 3 (psycopg[pool])
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+ENDPOINTS = [
+    ('students_page', 'students-api', {'limit': 50}),
+    ('teachers', 'teachers-api', {}),
+    ('regions', 'regions-api', {}),
+]
+
+
+class Command(BaseCommand):
+    help = ('Задержка запросов к спискам при разных режимах подключения к БД: '
+            'подключение на каждый запрос (CONN_MAX_AGE=0), постоянные подключения и пул psycopg 3. '
+            'После каждого ответа подключения закрываются так же, как по сигналу request_finished на сервере. '
+            'Нужны данные в базе (manage.py generate_dataset).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Алиас базы из DATABASES')
+        parser.add_argument('--requests', type=int, default=200, help='Запросов на эндпоинт в каждом режиме')
+        parser.add_argument('--output', help='Куда записать результаты (JSON)')
+
+    def modes(self, connection):
+        modes = [('per_request', {'CONN_MAX_AGE': 0}), ('persistent', {'CONN_MAX_AGE': 600})]
+        if connection.vendor == 'postgresql' and is_psycopg3():
+            modes.append(('pool', {'CONN_MAX_AGE': 0, 'pool': {'min_size': 2, 'max_size': 4}}))
+        return modes
+
+    def configure(self, connection, mode):
+        # Новые настройки подхватываются при следующем подключении
+        connection.close()
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+        connection.settings_dict['CONN_MAX_AGE'] = mode['CONN_MAX_AGE']
+        options = connection.settings_dict.setdefault('OPTIONS', {})
+        if 'pool' in mode:
+            options['pool'] = mode['pool']
+        else:
+            options.pop('pool', None)
+
+    def measure(self, client, url, params, count):
+        opened = []
+
+        def on_connect(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(on_connect)
+        try:
+            timings = []
+            for _ in range(count):
+                start = time.perf_counter()
+                response = client.get(url, params)
+                timings.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError(f'{url}: код ответа {response.status_code}')
+                # Тестовый клиент отключает close_old_connections от request_finished
+                close_old_connections()
+        finally:
+            connection_created.disconnect(on_connect)
+        return {
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'p95_ms': round(sorted(timings)[int(len(timings) * 0.95) - 1] * 1000, 2),
+            'connections_opened': len(opened),
+        }
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                f'{connection.vendor}: подключение почти бесплатное, цифры не показательны (нужен PostgreSQL)'
+            ))
+        if not Student.objects.exists():
+            raise CommandError('В базе нет студентов, сначала выполните manage.py generate_dataset')
+
+        admin = User.objects.create_superuser(BENCH_USERNAME, password=None)
+        token = str(RefreshToken.for_user(admin).access_token)
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        original = {
+            'CONN_MAX_AGE': connection.settings_dict.get('CONN_MAX_AGE', 0),
+            'OPTIONS': dict(connection.settings_dict.get('OPTIONS', {})),
+        }
+
+        results = {}
+        try:
+            # Тестовый клиент шлет Host: testserver
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for mode_name, mode in self.modes(connection):
+                    self.configure(connection, mode)
+                    self.stdout.write(f'Режим: {mode_name}')
+                    for name, url_name, params in ENDPOINTS:
+                        url = reverse(url_name)
+                        client.get(url, params)  # Прогрев кэшей
+                        row = self.measure(client, url, params, options['requests'])
+                        results.setdefault(name, {})[mode_name] = row
+                        self.stdout.write(
+                            f"  {name:<14} медиана {row['median_ms']:7.2f} мс   p95 {row['p95_ms']:7.2f} мс   "
+                            f"новых подключений: {row['connections_opened']}"
+                        )
+        finally:
+            connection.close()
+            if hasattr(connection, 'close_pool'):
+                connection.close_pool()
+            connection.settings_dict['CONN_MAX_AGE'] = original['CONN_MAX_AGE']
+            connection.settings_dict['OPTIONS'] = original['OPTIONS']
+            admin.delete()
+
+        for name, modes in results.items():
+            base = modes['per_request']['median_ms']
+            saved = ', '.join(
+                f"{mode_name}: {base - row['median_ms']:+.2f} мс" for mode_name, row in modes.items()
+                if mode_name != 'per_request'
+            )
+            self.stdout.write(f'{name:<14} экономия на запрос относительно подключения на каждый запрос: {saved}')
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+            self.stdout.write(f"Результаты записаны в {options['output']}")
@@ -0,0 +1,101 @@
+import random
+import statistics
+import time
+from datetime import date
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from app.models import CodeSpeciality, Speciality, Qualification, Group, Student, Teacher
+from app.search import search_people, use_trigram
+
+LASTNAMES = ['Иванов', 'Петров', 'Сидоров', 'Гарипов', 'Хасанов', 'Смирнов', 'Кузнецов', 'Валиев']
+NAMES = ['Алексей', 'Булат', 'Дмитрий', 'Ильнур', 'Марат', 'Никита', 'Руслан', 'Тимур']
+MIDDLENAMES = ['Сергеевич', 'Ринатович', 'Андреевич', 'Ильдарович', None]
+
+# Запросы: точное слово, префикс, опечатка, фамилия + имя
+QUERIES = ['Хасанов', 'Гари', 'Сидорв', 'Петров Тимур', 'Ильдарович']
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает поиск по ФИО через app.search (pg_trgm) и старый поиск админки '
+            '(ILIKE по search_fields). Данные создаются во временной транзакции и откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--people', type=int, default=100000, help='Количество студентов и преподавателей')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов каждого запроса (берется медиана)')
+
+    def seed(self, people):
+        rnd = random.Random(0)
+        code = CodeSpeciality.objects.create(code='99.99.98')
+        speciality = Speciality.objects.create(code=code, name='bench')
+        qualification = Qualification.objects.create(speciality=speciality, name='bench')
+        group = Group.objects.create(name='bench', speciality=speciality, qualification=qualification)
+
+        users = User.objects.bulk_create(
+            (User(username=f'bench-search-{i}') for i in range(people)), batch_size=5000,
+        )
+        teachers = people // 20
+
+        def person(i):
+            # Суффикс делает фамилии разными, как в реальной базе
+            return dict(
+                lastname=f'{rnd.choice(LASTNAMES)}{"а" if i % 2 else ""}{i % 997 or ""}',
+                name=rnd.choice(NAMES),
+                middlename=rnd.choice(MIDDLENAMES),
+                birth_date=date(2000, 1, 1),
+                phone='+79000000000',
+            )
+
+        Teacher.objects.bulk_create(
+            (Teacher(user=user, **person(i)) for i, user in enumerate(users[:teachers])), batch_size=5000,
+        )
+        Student.objects.bulk_create(
+            (Student(user=user, group=group, **person(i)) for i, user in enumerate(users[teachers:])),
+            batch_size=5000,
+        )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE app_student, app_teacher, auth_user')
+
+    def median_ms(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    def ilike_search(self, query):
+        # Так искала админка: каждое слово ищется подстрокой в каждом из search_fields
+        fields = ['lastname', 'name', 'middlename', 'user__username']
+        results = []
+        for model in (Student, Teacher):
+            condition = Q()
+            for word in query.split():
+                condition &= reduce(or_, (Q(**{f'{field}__icontains': word}) for field in fields))
+            results += list(model.objects.filter(condition).values_list('pk', flat=True)[:20])
+        return results
+
+    def handle(self, *args, **options):
+        people, repeat = options['people'], options['repeat']
+        if not use_trigram():
+            self.stdout.write(self.style.WARNING('Не PostgreSQL: поиск работает без pg_trgm, цифры не показательны'))
+
+        with transaction.atomic():
+            self.seed(people)
+            self.stdout.write(f'Людей: {people}, повторов: {repeat}')
+            for query in QUERIES:
+                before = self.median_ms(lambda: self.ilike_search(query), repeat)
+                after = self.median_ms(lambda: search_people(query), repeat)
+                found = search_people(query)
+                top = found[0]['full_name'] if found else '—'
+                self.stdout.write(
+                    f'{query:<14} ILIKE: {before:8.1f} мс   pg_trgm: {after:8.1f} мс   '
+                    f'найдено: {len(found):>2}, первый: {top}'
+                )
+            transaction.set_rollback(True)
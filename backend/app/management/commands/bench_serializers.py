@@ -0,0 +1,84 @@
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from app.models import (
+    Region, City, Role, CodeSpeciality, Speciality, Qualification, Group, Student, Teacher,
+)
+from app.serializers.city_serializers import CitySerializer, CityValuesSerializer
+from app.serializers.role_serializers import RoleSerializer, RoleValuesSerializer
+from app.serializers.student_serializers import StudentSerializer, StudentValuesSerializer
+from app.serializers.teacher_serializers import TeacherSerializer, TeacherValuesSerializer
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает ModelSerializer и ValuesSerializer на списках из N строк. '
+            'Данные создаются во временной транзакции и откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Количество строк в каждом списке')
+        parser.add_argument('--repeat', type=int, default=3, help='Количество повторов (берется лучший)')
+
+    def seed(self, rows):
+        region = Region.objects.create(name='bench-region')
+        City.objects.bulk_create(City(name=f'bench-city-{i}', region=region) for i in range(rows))
+        Role.objects.bulk_create(Role(name=f'bench-role-{i}') for i in range(rows))
+
+        code = CodeSpeciality.objects.create(code='99.99.99')
+        speciality = Speciality.objects.create(code=code, name='bench')
+        qualification = Qualification.objects.create(speciality=speciality, name='bench')
+        group = Group.objects.create(name='bench', speciality=speciality, qualification=qualification)
+
+        users = User.objects.bulk_create(User(username=f'bench-user-{i}') for i in range(rows * 2))
+        people = dict(birth_date=date(2000, 1, 1), phone='+79000000000', middlename='Иванович')
+        Student.objects.bulk_create(
+            Student(user=user, lastname=f'Фамилия{i}', name='Имя', group=group, **people)
+            for i, user in enumerate(users[:rows])
+        )
+        Teacher.objects.bulk_create(
+            Teacher(user=user, lastname=f'Фамилия{i}', name='Имя', **people)
+            for i, user in enumerate(users[rows:])
+        )
+
+    def best_time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        renderer = JSONRenderer()
+        cases = [
+            ('students', lambda: Student.objects.select_related('user', 'group', 'city').with_course(),
+             StudentSerializer, lambda: Student.objects.with_course(), StudentValuesSerializer),
+            ('teachers', lambda: Teacher.objects.select_related('user'),
+             TeacherSerializer, lambda: Teacher.objects.all(), TeacherValuesSerializer),
+            ('cities', lambda: City.objects.select_related('region'),
+             CitySerializer, lambda: City.objects.all(), CityValuesSerializer),
+            ('roles', lambda: Role.objects.all(),
+             RoleSerializer, lambda: Role.objects.all(), RoleValuesSerializer),
+        ]
+
+        with transaction.atomic():
+            self.seed(rows)
+            self.stdout.write(f'Строк в каждом списке: {rows}, повторов: {repeat}')
+            for name, model_qs, model_serializer, values_qs, values_serializer in cases:
+                before, expected = self.best_time(
+                    lambda: renderer.render(model_serializer(model_qs(), many=True).data), repeat)
+                after, actual = self.best_time(
+                    lambda: renderer.render(values_serializer(values_qs()).data), repeat)
+                if expected != actual:
+                    raise CommandError(f'{name}: JSON отличается от ModelSerializer')
+                self.stdout.write(
+                    f'{name:<9} ModelSerializer: {before * 1000:8.1f} мс   '
+                    f'ValuesSerializer: {after * 1000:8.1f} мс   x{before / after:.1f}'
+                )
+            transaction.set_rollback(True)
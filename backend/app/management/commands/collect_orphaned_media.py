@@ -0,0 +1,123 @@
+import os
+import posixpath
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Student, Teacher
+from app.renditions import RENDITIONS_ROOT, photo_version, rendition_dir
+
+PHOTO_MODELS = (Student, Teacher)
+
+
+def iter_files(root, relative_dir):
+    """
+    Файлы каталога MEDIA_ROOT/relative_dir рекурсивно: (путь относительно MEDIA_ROOT, DirEntry).
+    os.scandir не делает лишний stat на каждый файл, в отличие от os.walk + os.path.*
+    """
+    stack = [relative_dir]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, current))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                relative = posixpath.join(current, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(relative)
+                elif entry.is_file(follow_symlinks=False):
+                    yield relative, entry
+
+
+class Command(BaseCommand):
+    help = ('Находит в MEDIA_ROOT фото и превью, на которые не ссылается ни одна запись '
+            '(включая мягко удаленные), и удаляет их порциями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, ничего не удалять')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Размер порции удаления')
+        parser.add_argument('--min-age', type=int, default=60,
+                            help='Не трогать файлы моложе N минут (загрузки в незавершенных транзакциях)')
+        parser.add_argument('--verbose-files', action='store_true', help='Печатать каждый найденный файл')
+
+    def load_referenced(self):
+        """Имена фото и каталоги актуальных превью из БД, потоково"""
+        photos = set()
+        rendition_dirs = set()
+        for model in PHOTO_MODELS:
+            rows = (
+                model.all_objects.exclude(photo='').exclude(photo__isnull=True)
+                .values_list('pk', 'photo').iterator(chunk_size=5000)
+            )
+            model_name = model._meta.model_name
+            for pk, photo in rows:
+                photos.add(photo)
+                rendition_dirs.add(posixpath.join(rendition_dir(model_name, pk), photo_version(photo)))
+        return photos, rendition_dirs
+
+    def handle(self, *args, **options):
+        root = settings.MEDIA_ROOT
+        if not root or not os.path.isdir(root):
+            raise CommandError(f'MEDIA_ROOT не найден: {root}')
+        dry_run, batch_size = options['dry_run'], options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        verbose = options['verbose_files']
+
+        started = time.perf_counter()
+        photos, rendition_dirs = self.load_referenced()
+        loaded = time.perf_counter()
+
+        cutoff = time.time() - options['min_age'] * 60
+        photo_dirs = sorted({model._meta.get_field('photo').upload_to.rstrip('/') for model in PHOTO_MODELS})
+
+        stats = {'scanned': 0, 'orphaned': 0, 'bytes': 0, 'deleted': 0, 'skipped_young': 0}
+        batch = []
+
+        def flush():
+            for path in batch:
+                try:
+                    os.remove(path)
+                    stats['deleted'] += 1
+                except FileNotFoundError:
+                    pass
+            batch.clear()
+            self.stdout.write(f"  удалено {stats['deleted']} из {stats['orphaned']} найденных...")
+
+        def check(relative, entry, referenced):
+            stats['scanned'] += 1
+            if referenced(relative):
+                return
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > cutoff:
+                stats['skipped_young'] += 1
+                return
+            stats['orphaned'] += 1
+            stats['bytes'] += stat.st_size
+            if verbose:
+                self.stdout.write(relative)
+            if not dry_run:
+                batch.append(entry.path)
+                if len(batch) >= batch_size:
+                    flush()
+
+        for directory in photo_dirs:
+            for relative, entry in iter_files(root, directory):
+                check(relative, entry, photos.__contains__)
+        for relative, entry in iter_files(root, RENDITIONS_ROOT):
+            check(relative, entry, lambda path: posixpath.dirname(path) in rendition_dirs)
+        if batch:
+            flush()
+
+        elapsed = time.perf_counter() - started
+        rate = stats['scanned'] / elapsed if elapsed else 0
+        mode = 'пробный запуск, ничего не удалено' if dry_run else f"удалено {stats['deleted']}"
+        self.stdout.write(
+            f"Ссылок в БД: {len(photos)} (загружено за {loaded - started:.2f} с)\n"
+            f"Просмотрено файлов: {stats['scanned']} за {elapsed:.2f} с ({rate:.0f} файлов/с)\n"
+            f"Осиротевших: {stats['orphaned']} ({stats['bytes'] / 1024 / 1024:.1f} МБ), {mode}\n"
+            f"Пропущено новых файлов (моложе {options['min_age']} мин): {stats['skipped_young']}"
+        )
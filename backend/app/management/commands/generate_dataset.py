@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.datasets import clear_dataset, generate_dataset
+from app.reference_data import bump_version
+from app.statistics import invalidate_group_statistics
+
+
+class Command(BaseCommand):
+    help = ('Генерирует детерминированный набор данных: регионы, города, специальности, '
+            'квалификации, группы, преподаватели и студенты с пользователями (массовыми вставками).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000, help='Количество студентов')
+        parser.add_argument('--teachers', type=int, default=500, help='Количество преподавателей')
+        parser.add_argument('--group-size', type=int, default=25, help='Студентов в группе')
+        parser.add_argument('--seed', type=int, default=0, help='Зерно генератора (одинаковое - одинаковые данные)')
+        parser.add_argument('--clear', action='store_true', help='Сначала удалить ранее сгенерированные данные')
+
+    def handle(self, *args, **options):
+        if options['students'] < 0 or options['teachers'] < 0 or options['group_size'] < 1:
+            raise CommandError('Количества должны быть неотрицательными, размер группы - больше нуля')
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            if options['clear']:
+                clear_dataset()
+            counts = generate_dataset(
+                students=options['students'],
+                teachers=options['teachers'],
+                seed=options['seed'],
+                group_size=options['group_size'],
+            )
+        # Сигналы массовых вставок уже сбросили кэши, но статистику могли пересчитать до коммита
+        bump_version()
+        invalidate_group_statistics()
+
+        summary = ', '.join(f'{name}: {count}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано за {time.perf_counter() - started:.1f} с. {summary}'
+        ))
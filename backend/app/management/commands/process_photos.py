@@ -0,0 +1,28 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from app.photos import process_pending, requeue_stale
+
+
+class Command(BaseCommand):
+    help = ('Обрабатывает очередь фотографий (PhotoJob). Нужна, если фоновый пул '
+            'в веб-процессах отключен (PHOTO_WORKERS=0) или процесс перезапустился с задачами в очереди.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, опрашивая очередь')
+        parser.add_argument('--interval', type=float, default=2.0, help='Пауза между опросами, сек')
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help='Через сколько минут зависшая задача возвращается в очередь')
+
+    def handle(self, *args, **options):
+        stale = timedelta(minutes=options['stale_minutes'])
+        while True:
+            requeued = requeue_stale(stale)
+            done = process_pending()
+            if done or requeued:
+                self.stdout.write(f'Обработано фото: {done}, возвращено в очередь: {requeued}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+
+class Command(BaseCommand):
+    help = ('Проба при старте: ждет, пока база примет подключение и выполнит SELECT 1, '
+            'и выводит настройки подключений (постоянные подключения, пул). '
+            'Завершается с ошибкой, если база не ответила за --timeout секунд.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Алиас базы из DATABASES')
+        parser.add_argument('--timeout', type=float, default=30, help='Сколько секунд ждать')
+        parser.add_argument('--interval', type=float, default=1, help='Пауза между попытками, секунд')
+
+    def probe(self, connection):
+        started = time.perf_counter()
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        return time.perf_counter() - started
+
+    def describe(self, connection):
+        settings_dict = connection.settings_dict
+        pool = settings_dict.get('OPTIONS', {}).get('pool')
+        if pool:
+            if not isinstance(pool, dict):
+                return 'пул подключений с параметрами psycopg_pool по умолчанию'
+            return (f"пул подключений {pool.get('min_size')}..{pool.get('max_size')}, "
+                    f"ожидание свободного {pool.get('timeout')} с")
+        max_age = settings_dict.get('CONN_MAX_AGE', 0)
+        if max_age is None:
+            lifetime = 'постоянные подключения без ограничения времени'
+        elif max_age:
+            lifetime = f'постоянные подключения на {max_age} с'
+        else:
+            lifetime = 'подключение на каждый запрос'
+        checks = 'с проверкой' if settings_dict.get('CONN_HEALTH_CHECKS') else 'без проверки'
+        return f'{lifetime}, {checks} перед повторным использованием'
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        deadline = time.monotonic() + options['timeout']
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                elapsed = self.probe(connection)
+                break
+            except OperationalError as exc:
+                connection.close()
+                if time.monotonic() + options['interval'] > deadline:
+                    raise CommandError(
+                        f"База {options['database']} недоступна после {attempt} попыток: {exc}"
+                    )
+                self.stdout.write(f'База недоступна, попытка {attempt}: {str(exc).strip()}')
+                time.sleep(options['interval'])
+
+        connection.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"База {options['database']} ({connection.vendor}) доступна: "
+            f'подключение и SELECT 1 за {elapsed * 1000:.1f} мс; {self.describe(connection)}'
+        ))
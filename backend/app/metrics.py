@@ -0,0 +1,250 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+# Границы корзин гистограмм (как у Prometheus: значение попадает в первую корзину, где оно <= границы)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Метрики запроса, который сейчас обрабатывается в этом потоке / asyncio-задаче
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Счетчики одного запроса: SQL-запросы и их время, время отдельных этапов"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.sections = {}
+        self.duration = None
+
+    def add_section(self, name, seconds):
+        self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+        return self.duration
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing (длительности в миллисекундах)"""
+        parts = [f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"']
+        parts += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.sections.items()]
+        if self.duration is not None:
+            parts.append(f'total;dur={self.duration * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def _enter_wrappers(stack):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(_execute_wrapper))
+
+
+@contextmanager
+def collect_metrics():
+    """
+    Считает SQL-запросы и их время внутри блока (на всех подключениях к БД).
+    Вне HTTP-запроса удобно для замеров в shell и тестах.
+    """
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            _enter_wrappers(stack)
+            yield metrics
+    finally:
+        _current.reset(token)
+        if metrics.duration is None:
+            metrics.finish()
+
+
+@asynccontextmanager
+async def acollect_metrics():
+    """
+    collect_metrics для async-кода. Подключения к БД у каждого потока свои,
+    а async ORM выполняет запросы в потоке sync_to_async - обертки ставятся там же.
+    """
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    stack = ExitStack()
+    try:
+        await sync_to_async(_enter_wrappers)(stack)
+        try:
+            yield metrics
+        finally:
+            await sync_to_async(stack.close)()
+    finally:
+        _current.reset(token)
+        if metrics.duration is None:
+            metrics.finish()
+
+
+@contextmanager
+def timed(section):
+    """Добавляет время блока к этапу section текущего запроса (если метрики собираются)"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_section(section, time.perf_counter() - start)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами: память не растет с числом наблюдений"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # последняя корзина - +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q):
+        """Оценка квантиля линейной интерполяцией внутри корзины (как histogram_quantile)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for bound, count in zip(self.buckets, self.counts):
+            if seen + count >= rank and count:
+                return lower + (bound - lower) * (rank - seen) / count
+            lower, seen = bound, seen + count
+        # Попало в +Inf: точнее верхней границы сказать нельзя
+        return self.buckets[-1]
+
+
+class ViewStats:
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_seconds = 0.0
+        self.sections = {}
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+class MetricsRegistry:
+    """
+    Сводные метрики по именам URL. Хранятся в памяти процесса:
+    при нескольких воркерах каждый отдает свои, Prometheus суммирует их сам.
+    """
+
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def record(self, view, status_code, metrics, response_bytes=None):
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = ViewStats()
+            stats.duration.observe(metrics.duration)
+            stats.queries.observe(metrics.queries)
+            stats.db_seconds += metrics.db_time
+            for name, seconds in metrics.sections.items():
+                stats.sections[name] = stats.sections.get(name, 0.0) + seconds
+            if response_bytes is not None:
+                stats.response_bytes += response_bytes
+            status = str(status_code)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {view: stats for view, stats in self._views.items()}
+
+    def render_prometheus(self):
+        """Текстовый формат Prometheus (text/plain; version=0.0.4)"""
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name, attr, views):
+            for view, stats in views:
+                hist = getattr(stats, attr)
+                for bound, total in hist.cumulative():
+                    le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                    lines.append(f'{name}_bucket{{view="{view}",le="{le}"}} {total}')
+                lines.append(f'{name}_sum{{view="{view}"}} {hist.sum:.6f}')
+                lines.append(f'{name}_count{{view="{view}"}} {hist.count}')
+
+        with self._lock:
+            views = sorted(self._views.items())
+
+            metric('http_request_duration_seconds', 'histogram', 'Время обработки запроса')
+            histogram('http_request_duration_seconds', 'duration', views)
+
+            metric('http_request_duration_quantile_seconds', 'gauge', 'Оценка квантилей времени по гистограмме')
+            for view, stats in views:
+                for q in QUANTILES:
+                    value = stats.duration.quantile(q)
+                    if value is not None:
+                        lines.append(
+                            f'http_request_duration_quantile_seconds{{view="{view}",quantile="{q}"}} {value:.6f}'
+                        )
+
+            metric('http_request_queries', 'histogram', 'SQL-запросов на HTTP-запрос')
+            histogram('http_request_queries', 'queries', views)
+
+            metric('http_request_db_seconds_total', 'counter', 'Суммарное время SQL-запросов')
+            for view, stats in views:
+                lines.append(f'http_request_db_seconds_total{{view="{view}"}} {stats.db_seconds:.6f}')
+
+            metric('http_request_section_seconds_total', 'counter', 'Суммарное время этапов (serialize и др.)')
+            for view, stats in views:
+                for section, seconds in sorted(stats.sections.items()):
+                    lines.append(
+                        f'http_request_section_seconds_total{{view="{view}",section="{section}"}} {seconds:.6f}'
+                    )
+
+            metric('http_response_bytes_total', 'counter', 'Суммарный размер ответов (без потоковых)')
+            for view, stats in views:
+                lines.append(f'http_response_bytes_total{{view="{view}"}} {stats.response_bytes}')
+
+            metric('http_responses_total', 'counter', 'Ответов по кодам статуса')
+            for view, stats in views:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_responses_total{{view="{view}",status="{status}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
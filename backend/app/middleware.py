@@ -1,10 +1,20 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
 from django.utils.deprecation import MiddlewareMixin
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
 from django.conf import settings
 
+from .audit import audit_request
+from .db_routers import read_from_replica, replica_aliases
+from .authentication import CachedJWTAuthentication, REQUEST_AUTH_ATTR
+from .metrics import acollect_metrics, collect_metrics, registry
+
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Один экземпляр на процесс вместо создания на каждый запрос
+        self.jwt_auth = CachedJWTAuthentication()
+
     def process_request(self, request):
         # Пропускаем пути аутентификации
         auth_paths = ['/api/auth/login/', '/api/auth/refresh/', '/api/auth/verify/']
@@ -15,12 +25,117 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
         access_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE'])
 
         if access_token:
-            try:
-                jwt_auth = JWTAuthentication()
-                validated_token = jwt_auth.get_validated_token(access_token)
-                request.user = jwt_auth.get_user(validated_token)
-                request.auth = validated_token
-            except (InvalidToken, AuthenticationFailed):
+            result = self.jwt_auth.authenticate_raw_token(access_token)
+            # Сохраняем результат, чтобы DRF не проверял тот же токен повторно
+            setattr(request, REQUEST_AUTH_ATTR, result)
+            if result is not None:
+                request.user, request.auth = result
+            else:
                 # Токен невалиден, пользователь не аутентифицирован
                 request.user = None
-                request.auth = None
\ No newline at end of file
+                request.auth = None
+
+
+class AuditContextMiddleware:
+    """Делает текущий запрос доступным для BaseModel.save на время его обработки"""
+    # Поддержка async нужна, чтобы под ASGI async-представления не уходили в поток
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with audit_request(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with audit_request(request):
+            return await self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """
+    Число SQL-запросов, их время, время сериализации и размер ответа для каждого запроса.
+    Включается настройкой REQUEST_METRICS; отдает заголовок Server-Timing
+    и копит сводку по именам URL для /api/metrics/.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+        return self.record(request, response, metrics)
+
+    async def __acall__(self, request):
+        async with acollect_metrics() as metrics:
+            response = await self.get_response(request)
+        return self.record(request, response, metrics)
+
+    def record(self, request, response, metrics):
+        metrics.finish()
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unmatched'
+        size = None if response.streaming else len(response.content)
+        registry.record(view, response.status_code, metrics, response_bytes=size)
+        response['Server-Timing'] = metrics.server_timing()
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Чтения безопасных запросов (GET, HEAD, OPTIONS) идут на реплики (app.db_routers.ReplicaRouter).
+    После небезопасного запроса клиент получает куку на READ_YOUR_WRITES_SECONDS секунд:
+    пока она есть, он читает с основной базы и видит свои изменения, даже если реплика отстает.
+    Без REPLICA_DATABASES не подключается.
+    """
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'read_primary'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def use_replica(self, request):
+        return request.method in self.safe_methods and self.cookie_name not in request.COOKIES
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with read_from_replica(self.use_replica(request)):
+            response = self.get_response(request)
+        return self.pin_to_primary(request, response)
+
+    async def __acall__(self, request):
+        with read_from_replica(self.use_replica(request)):
+            response = await self.get_response(request)
+        return self.pin_to_primary(request, response)
+
+    def pin_to_primary(self, request, response):
+        if request.method not in self.safe_methods:
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=settings.READ_YOUR_WRITES_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,91 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_role_student_role'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='city',
+            name='app_city_is_dele_d14a33_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='city',
+            name='app_city_is_dele_25f378_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='codespeciality',
+            name='app_codespe_is_dele_202914_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='group',
+            name='app_group_is_dele_2a9e95_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='qualification',
+            name='app_qualifi_is_dele_54d13e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='region',
+            name='app_region_is_dele_08d726_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='speciality',
+            name='app_special_is_dele_d435d0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='app_student_is_dele_828855_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='teacher',
+            name='app_teacher_is_dele_b69ef3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['name'], name='city_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['region', 'name'], name='city_active_region_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codespeciality',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['code'], name='codespec_active_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['is_active', 'start_year'], name='group_active_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='qualification',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['speciality', 'based'], name='qualif_active_spec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='region',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['name'], name='region_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='speciality',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['is_active', 'name'], name='speciality_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['name', 'lastname', 'id'], name='student_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['group', 'name', 'lastname'], name='student_active_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['lastname', 'name', 'middlename'], name='teacher_active_fio_idx'),
+        ),
+    ]
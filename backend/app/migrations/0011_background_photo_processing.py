@@ -0,0 +1,62 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:05
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def mark_existing_photos_ready(apps, schema_editor):
+    # Фото, загруженные до появления очереди, уже были сжаты ProcessedImageField
+    for model_name in ('Student', 'Teacher'):
+        model = apps.get_model('app', model_name)
+        model.objects.exclude(photo__isnull=True).exclude(photo='').update(photo_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_soft_delete_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='photo_status',
+            field=models.CharField(choices=[('none', 'Нет фото'), ('pending', 'Обрабатывается'), ('ready', 'Готово'), ('failed', 'Ошибка обработки')], default='none', editable=False, help_text='Состояние фоновой обработки фотографии', max_length=10, verbose_name='Обработка фотографии'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='photo_status',
+            field=models.CharField(choices=[('none', 'Нет фото'), ('pending', 'Обрабатывается'), ('ready', 'Готово'), ('failed', 'Ошибка обработки')], default='none', editable=False, help_text='Состояние фоновой обработки фотографии', max_length=10, verbose_name='Обработка фотографии'),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='photo',
+            field=models.ImageField(blank=True, help_text='Загрузите фотографию. Она будет автоматически сжата до 800x800 пикселей', null=True, upload_to='students/photos/', validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'png'])], verbose_name='Фотография студента'),
+        ),
+        migrations.AlterField(
+            model_name='teacher',
+            name='photo',
+            field=models.ImageField(blank=True, help_text='Загрузите фотографию. Она будет автоматически сжата до 800x800 пикселей', null=True, upload_to='teachers/photos/', validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'png'])], verbose_name='Фотография преподавателя'),
+        ),
+        migrations.CreateModel(
+            name='PhotoJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='Например, app.student', max_length=50, verbose_name='Модель')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID записи')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('processing', 'Выполняется'), ('done', 'Выполнена'), ('failed', 'Ошибка')], default='pending', max_length=10, verbose_name='Статус')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало обработки')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание обработки')),
+            ],
+            options={
+                'verbose_name': 'Обработка фотографии',
+                'verbose_name_plural': 'Обработка фотографий',
+                'ordering': ['pk'],
+                'indexes': [models.Index(fields=['status', 'id'], name='app_photojo_status_e6a54f_idx')],
+            },
+        ),
+        migrations.RunPython(mark_existing_photos_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_trigram_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssuedCertificate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issued_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата выдачи')),
+                ('student', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='certificates', to='app.student', verbose_name='Студент')),
+            ],
+            options={
+                'verbose_name': 'Выданная справка',
+                'verbose_name_plural': 'Выданные справки',
+                'ordering': ['pk'],
+            },
+        ),
+    ]
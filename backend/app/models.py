@@ -1,19 +1,130 @@
 from django.contrib.auth.models import User, AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
-from imagekit.models import ProcessedImageField
-from imagekit.processors import ResizeToFit, Transpose
 from django.core.validators import FileExtensionValidator, MaxValueValidator
+import hashlib
+import logging
 import os
 
+from .renditions import invalidate_renditions
+
+logger = logging.getLogger(__name__)
+
 
 # ==============================================================
 # ================АБСТРАКТНЫЕ МОДЕЛИ И МЕНЕДЖЕРЫ================
 # ==============================================================
 
-class SoftDeleteManager(models.Manager):
+# Отправляется после массовых операций QuerySet (update, bulk_create, bulk_update),
+# для которых Django не шлет post_save. sender - класс модели,
+# fields - список измененных полей (для update и bulk_update).
+rows_changed = Signal()
+
+
+class AuditQuerySet(models.QuerySet):
+    """
+    QuerySet, заполняющий поля аудита и в массовых операциях,
+    которые обходят Model.save().
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .audit import get_current_user
+
+        user = get_current_user()
+        if user is not None:
+            objs = list(objs)
+            for obj in objs:
+                if obj.created_by_id is None:
+                    obj.created_by = user
+                obj.updated_by = user
+        result = super().bulk_create(objs, *args, **kwargs)
+        rows_changed.send(sender=self.model)
+        return result
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from .audit import get_current_user
+
+        user = get_current_user()
+        audit_fields = ['updated_at'] if user is None else ['updated_at', 'updated_by']
+        now = timezone.now()
+        objs = list(objs)
+        for obj in objs:
+            obj.updated_at = now
+            if user is not None:
+                obj.updated_by = user
+        fields = list(fields) + [f for f in audit_fields if f not in fields]
+        result = super().bulk_update(objs, fields, *args, **kwargs)
+        rows_changed.send(sender=self.model, fields=fields)
+        return result
+
+    def update(self, **kwargs):
+        from .audit import get_current_user
+
+        # auto_now не срабатывает при QuerySet.update(), проставляем вручную
+        kwargs.setdefault('updated_at', timezone.now())
+        user = get_current_user()
+        if user is not None:
+            kwargs.setdefault('updated_by', user)
+        result = super().update(**kwargs)
+        rows_changed.send(sender=self.model, fields=list(kwargs))
+        return result
+
+
+class SoftDeleteQuerySet(AuditQuerySet):
+    """
+    Массовое мягкое удаление и восстановление одним UPDATE.
+    Каскад описывается в модели атрибутом soft_delete_cascade -
+    списком имен обратных связей на мягко удаляемые модели.
+    """
+
+    def _cascade_relations(self):
+        for name in getattr(self.model, 'soft_delete_cascade', ()):
+            relation = self.model._meta.get_field(name)
+            yield relation.related_model, relation.field.name
+
+    def soft_delete(self, deleted_by=None, cascade=False):
+        """Помечает записи удаленными, возвращает количество затронутых строк"""
+        now = timezone.now()
+        if not cascade:
+            return self._soft_delete(now, deleted_by, cascade)
+        with transaction.atomic(using=self.db):
+            return self._soft_delete(now, deleted_by, cascade)
+
+    soft_delete.queryset_only = True
+
+    def _soft_delete(self, now, deleted_by, cascade):
+        active = self.filter(is_deleted=False)
+        if cascade:
+            for related_model, field_name in self._cascade_relations():
+                related_model.all_objects.filter(
+                    **{f'{field_name}__in': active.values('pk')}
+                )._soft_delete(now, deleted_by, cascade)
+        # Одинаковый deleted_at у родителя и каскадно удаленных строк
+        # позволяет потом восстановить их вместе
+        return active.update(is_deleted=True, deleted_at=now, deleted_by=deleted_by)
+
+    def restore(self, cascade=False):
+        """Снимает отметку об удалении, возвращает количество затронутых строк"""
+        deleted = self.filter(is_deleted=True)
+        if not cascade:
+            return deleted.update(is_deleted=False, deleted_at=None, deleted_by=None)
+
+        with transaction.atomic(using=self.db):
+            for related_model, field_name in self._cascade_relations():
+                # Только строки, удаленные вместе с родителем
+                related_model.all_objects.filter(
+                    **{f'{field_name}__in': deleted.values('pk')},
+                    is_deleted=True,
+                    deleted_at=models.F(f'{field_name}__deleted_at'),
+                ).restore(cascade=True)
+            return deleted.update(is_deleted=False, deleted_at=None, deleted_by=None)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     # Менеджер для работы с мягким удалением
     def get_queryset(self):
         # По умолчанию исключаем все удаленные объекты
@@ -27,11 +138,31 @@ class SoftDeleteManager(models.Manager):
         # Только удаленные записи
         return super().get_queryset().filter(is_deleted=True)
 
-    def restore(self, *args, **kwargs):
-        # Восстановление удаленных данных
-        qs = self.deleted_only().filter(*args, **kwargs)
-        qs.update(is_deleted=False, deleted_at=None, deleted_by=None)
-        return qs.count()
+    def restore(self, *args, cascade=False, **kwargs):
+        # Восстановление удаленных данных одним UPDATE
+        return self.deleted_only().filter(*args, **kwargs).restore(cascade=cascade)
+
+
+def active_index(*, fields, name):
+    """
+    Частичный индекс только по неудаленным строкам (is_deleted = False).
+    SoftDeleteManager всегда добавляет это условие, поэтому удаленные
+    записи в индексе лишь занимают место.
+    """
+    return models.Index(fields=fields, name=name, condition=models.Q(is_deleted=False))
+
+
+def fio_trigram_index(*, name):
+    """
+    GIN-индекс триграмм (pg_trgm) по фамилии, имени и отчеству для поиска (app.search).
+    Поддерживает оператор похожести % и ILIKE '%...%'. На SQLite создается обычный индекс.
+    Индекс не частичный: админка ищет и среди удаленных записей.
+    """
+    return GinIndex(
+        fields=['lastname', 'name', 'middlename'],
+        opclasses=['gin_trgm_ops'] * 3,
+        name=name,
+    )
 
 
 # Миксин для полей аудита (кто и когда удалил/обновил)
@@ -125,26 +256,209 @@ class SoftDeleteMixin(models.Model):
 # Базовая модель с аудитом и мягким удалением
 class BaseModel(AuditMixin, SoftDeleteMixin):
     objects = SoftDeleteManager()  # Кастомный менеджер для мягкого удаления
-    all_objects = models.Manager()  # Стандартный менеджер (для администратора)
+    all_objects = SoftDeleteQuerySet.as_manager()  # Все записи, включая удаленные (для администратора)
 
     class Meta:
         abstract = True
 
     # Автоматическое заполнение created_by/update_by при сохранении
     def save(self, *args, **kwargs):
+        # Импорт происходит здесь, чтобы избежать цикличного импорта
+        from .audit import get_current_user
+
+        # Пользователь берется из контекста запроса (AuditContextMiddleware);
+        # вне запроса (миграции, shell) его нет и поля аудита не трогаем
+        user = get_current_user()
+        if user is not None:
+            if self._state.adding:  # Если объект создается
+                self.created_by = user
+            self.updated_by = user
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'updated_by' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'updated_by']
+        super().save(*args, **kwargs)
+
+
+# =============================================================
+# =====================ОБРАБОТКА ФОТОГРАФИЙ=====================
+# =============================================================
+
+PHOTO_STATUS_NONE = 'none'
+PHOTO_STATUS_PENDING = 'pending'
+PHOTO_STATUS_READY = 'ready'
+PHOTO_STATUS_FAILED = 'failed'
+PHOTO_STATUS_CHOICES = (
+    (PHOTO_STATUS_NONE, 'Нет фото'),
+    (PHOTO_STATUS_PENDING, 'Обрабатывается'),
+    (PHOTO_STATUS_READY, 'Готово'),
+    (PHOTO_STATUS_FAILED, 'Ошибка обработки'),
+)
+
+
+def mark_photo_pending(instance, save_kwargs):
+    """
+    Перед сохранением: если загружен новый файл фото, ставит статус "обрабатывается".
+    Возвращает True, если после сохранения нужно поставить фото в очередь.
+    """
+    photo = instance.photo
+    # Незакоммиченный файл - только что загруженный, еще не записанный в хранилище
+    if not photo or getattr(photo, '_committed', True):
+        if not photo:
+            instance.photo_status = PHOTO_STATUS_NONE
+        return False
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None and 'photo' not in update_fields:
+        return False
+    instance.photo_status = PHOTO_STATUS_PENDING
+    if update_fields is not None and 'photo_status' not in update_fields:
+        save_kwargs['update_fields'] = [*update_fields, 'photo_status']
+    return True
+
+
+def name_photo_by_content(photo):
+    """
+    Добавляет к имени загруженного файла хэш его содержимого: photo.png -> photo-<хэш>.png.
+    От имени зависит версия в URL превью (renditions.photo_version), так она меняется вместе с фото.
+    """
+    digest = hashlib.md5()
+    for chunk in photo.chunks():
+        digest.update(chunk)
+    photo.seek(0)
+    stem, extension = os.path.splitext(os.path.basename(photo.name))
+    photo.name = f'{stem}-{digest.hexdigest()[:10]}{extension}'
+
+
+def enqueue_photo(instance):
+    # Импорт здесь, чтобы избежать цикличного импорта
+    from .photos import enqueue_photo as enqueue
+
+    enqueue(instance)
+
+
+def discard_photo_on_commit(model, pk, photo_name, all_renditions=False):
+    """
+    Удаляет файл фото и его превью после коммита транзакции.
+    При откате файл остается на месте, вместе со ссылкой на него в БД.
+    """
+    storage = model._meta.get_field('photo').storage
+    model_name = model._meta.model_name
+
+    def cleanup():
         try:
-            # Импорт происходит здесь, чтобы избежать цикличного импорта
-            from django.contrib.auth import get_user
+            storage.delete(photo_name)
+        except OSError:
+            # Файл подберет сборщик осиротевших файлов
+            logger.exception('Не удалось удалить фото %s', photo_name)
+        invalidate_renditions(
+            model_name, pk, photo_name=None if all_renditions else photo_name, storage=storage,
+        )
+
+    transaction.on_commit(cleanup)
+
+
+class PhotoMixin(models.Model):
+    """
+    Поле photo у студентов и преподавателей.
+    Запоминает имя фото, загруженное из БД, чтобы при сохранении понять,
+    заменили ли фото, без дополнительного SELECT. Новое фото отправляет
+    в фоновую обработку, старый файл удаляет после коммита.
+    """
+
+    class Meta:
+        abstract = True
+
+    def _remember_photo(self):
+        # При only()/defer() без photo имя неизвестно, его придется прочитать при сохранении
+        photo = self.__dict__.get('photo', models.DEFERRED)
+        self._loaded_photo = getattr(photo, 'name', photo)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_photo()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None or 'photo' in fields:
+            self._remember_photo()
+
+    def _get_loaded_photo(self):
+        if self._state.adding:
+            return None
+        loaded = getattr(self, '_loaded_photo', models.DEFERRED)
+        if loaded is models.DEFERRED:
+            loaded = type(self)._base_manager.filter(pk=self.pk).values_list('photo', flat=True).first()
+        return loaded or None
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'photo' not in update_fields:
+            # Фото не сохраняется (мягкое удаление, смена статуса и т.п.)
+            return super().save(*args, **kwargs)
+
+        old_photo = self._get_loaded_photo()
+        photo_uploaded = mark_photo_pending(self, kwargs)
+        if photo_uploaded:
+            name_photo_by_content(self.photo)
+        super().save(*args, **kwargs)
 
-            user = get_user()
-            if user and user.is_authenticated:
-                if not self.pk:  # Если объект создается
-                    self.created_by = user
-                self.updated_by = user
-            super().save(*args, **kwargs)
-        except:
-            # Если пользователь не доступен (например, в миграциях)
-            super().save(*args, **kwargs)
+        new_photo = self.photo.name or None
+        if old_photo and old_photo != new_photo:
+            discard_photo_on_commit(type(self), self.pk, old_photo)
+        self._loaded_photo = new_photo
+        if photo_uploaded:
+            enqueue_photo(self)
+
+    def hard_delete(self, using=None, keep_parents=False):
+        """Удаляем файл фото и все превью вместе с записью"""
+        photo_name, pk = self.photo.name, self.pk
+        super().hard_delete(using=using, keep_parents=keep_parents)
+        if photo_name:
+            discard_photo_on_commit(type(self), pk, photo_name, all_renditions=True)
+
+
+class PhotoJob(models.Model):
+    """Задача фоновой обработки фотографии (очередь в БД)"""
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'В очереди'),
+        (STATUS_PROCESSING, 'Выполняется'),
+        (STATUS_DONE, 'Выполнена'),
+        (STATUS_FAILED, 'Ошибка'),
+    )
+
+    model_label = models.CharField(
+        max_length=50,
+        verbose_name='Модель',
+        help_text='Например, app.student',
+    )
+    object_id = models.PositiveBigIntegerField(verbose_name='ID записи')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Попыток')
+    error = models.TextField(blank=True, default='', verbose_name='Ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Начало обработки')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Окончание обработки')
+
+    class Meta:
+        verbose_name = 'Обработка фотографии'
+        verbose_name_plural = 'Обработка фотографий'
+        ordering = ['pk']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f'{self.model_label}#{self.object_id} ({self.get_status_display()})'
 
 
 # =============================================================
@@ -177,7 +491,7 @@ class Region(BaseModel):
         ordering = ['name']
         indexes = [
             models.Index(fields=['name']),
-            models.Index(fields=['is_deleted', 'name']),
+            active_index(fields=['name'], name='region_active_name_idx'),
         ]
 
     def __str__(self):
@@ -206,16 +520,19 @@ class City(BaseModel):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['region']),
-            models.Index(fields=['is_deleted', 'name']),
-            models.Index(fields=['is_deleted', 'region']),
+            active_index(fields=['name'], name='city_active_name_idx'),
+            active_index(fields=['region', 'name'], name='city_active_region_idx'),
         ]
         unique_together = ['name', 'region']
 
     def __str__(self):
-        return f"{self.name} ({self.region.name})"
+        from .reference_data import reference_data
+
+        # Название региона из кэша справочников, без запроса к БД
+        return f"{self.name} ({reference_data.region_name(self.region_id)})"
 
 
-class Teacher(BaseModel):
+class Teacher(PhotoMixin, BaseModel):
     user = models.OneToOneField(
         User,
         on_delete=models.PROTECT,
@@ -242,18 +559,9 @@ class Teacher(BaseModel):
         null=True,
         blank=True,
     )
-    photo = ProcessedImageField(
+    # Оригинал сохраняется сразу, сжатие до 800x800 выполняет фоновый обработчик (app.photos)
+    photo = models.ImageField(
         upload_to='teachers/photos/',
-        processors=[
-            Transpose(),  # Автоматический поворот по EXIF (если фото с телефона)
-            ResizeToFit(800, 800),  # Максимальный размер 800x800 пикселей
-        ],
-        format='JPEG',
-        options={
-            'quality': 75,
-            'optimize': True,
-            'progressive': True,
-        },
         verbose_name='Фотография преподавателя',
         help_text='Загрузите фотографию. Она будет автоматически сжата до 800x800 пикселей',
         validators=[
@@ -262,6 +570,14 @@ class Teacher(BaseModel):
         blank=True,
         null=True,
     )
+    photo_status = models.CharField(
+        max_length=10,
+        choices=PHOTO_STATUS_CHOICES,
+        default=PHOTO_STATUS_NONE,
+        verbose_name='Обработка фотографии',
+        help_text='Состояние фоновой обработки фотографии',
+        editable=False,
+    )
     birth_date = models.DateField(
         verbose_name='Дата рождения',
         help_text='Введите дату рождения',
@@ -280,7 +596,9 @@ class Teacher(BaseModel):
             models.Index(fields=['name']),
             models.Index(fields=['lastname']),
             models.Index(fields=['user']),
-            models.Index(fields=['is_deleted', 'name', 'lastname', 'middlename']),
+            # Совпадает с ordering списка преподавателей
+            active_index(fields=['lastname', 'name', 'middlename'], name='teacher_active_fio_idx'),
+            fio_trigram_index(name='teacher_fio_trgm_idx'),
         ]
 
     @property
@@ -301,27 +619,6 @@ class Teacher(BaseModel):
     def __str__(self):
         return self.full_name
 
-    def save(self, *args, **kwargs):
-        """Удаляем старое фото при обновлении"""
-        if self.pk:  # Если объект уже существует
-            try:
-                old_teacher = Teacher.objects.get(pk=self.pk)
-                if old_teacher.photo and old_teacher.photo != self.photo:
-                    # Удаляем старый файл
-                    if os.path.exists(old_teacher.photo.path):
-                        os.remove(old_teacher.photo.path)
-            except Teacher.DoesNotExist:
-                pass
-
-        super().save(*args, **kwargs)
-
-    def delete(self, *args, **kwargs):
-        """Удаляем файл фото при удалении"""
-        if self.photo:
-            if os.path.exists(self.photo.path):
-                os.remove(self.photo.path)
-        super().delete(*args, **kwargs)
-
     def clean(self):
         """Валидация размера файла"""
         super().clean()
@@ -362,7 +659,7 @@ class CodeSpeciality(BaseModel):
         ordering = ['code']
         indexes = [
             models.Index(fields=['code']),
-            models.Index(fields=['is_deleted', 'code']),
+            active_index(fields=['code'], name='codespec_active_code_idx'),
         ]
 
     def __str__(self):
@@ -417,7 +714,7 @@ class Speciality(BaseModel):
             models.Index(fields=['name']),
             models.Index(fields=['code']),
             models.Index(fields=['is_active']),
-            models.Index(fields=['is_deleted', 'is_active', 'name']),
+            active_index(fields=['is_active', 'name'], name='speciality_active_name_idx'),
         ]
 
     def __str__(self):
@@ -473,7 +770,7 @@ class Qualification(BaseModel):
             models.Index(fields=['name']),
             models.Index(fields=['speciality']),
             models.Index(fields=['based']),
-            models.Index(fields=['is_deleted', 'speciality', 'based']),
+            active_index(fields=['speciality', 'based'], name='qualif_active_spec_idx'),
         ]
         unique_together = ['speciality', 'name', 'based']
 
@@ -570,6 +867,9 @@ class Group(BaseModel):
         help_text='Группа активна и ведет обучение'
     )
 
+    # При мягком удалении группы вместе с ней удаляются ее студенты
+    soft_delete_cascade = ['student']
+
     class Meta:
         verbose_name = 'Группа'
         verbose_name_plural = 'Группы'
@@ -581,7 +881,7 @@ class Group(BaseModel):
             models.Index(fields=['curator']),
             models.Index(fields=['is_active']),
             models.Index(fields=['start_year']),
-            models.Index(fields=['is_deleted', 'is_active', 'start_year']),
+            active_index(fields=['is_active', 'start_year'], name='group_active_year_idx'),
         ]
 
     def __str__(self):
@@ -596,7 +896,62 @@ class Group(BaseModel):
         super().save(*args, **kwargs)
 
 
-class Student(BaseModel):
+# =============================================================
+# ============================КУРСЫ============================
+# =============================================================
+
+ROMAN_COURSES = ['I', 'II', 'III', 'IV', 'V', 'VI']
+
+
+def current_academic_year():
+    """
+    Год начала текущего учебного года.
+    Если сейчас сентябрь (9) или позже - учебный год начался в этом году,
+    если август (8) или раньше - в прошлом году.
+    """
+    now = timezone.localdate()
+    return now.year if now.month >= 9 else now.year - 1
+
+
+def course_to_roman(course_num):
+    """Номер курса в римских цифрах (больше 6 - арабскими)"""
+    if course_num is None:
+        return None
+    if 1 <= course_num <= len(ROMAN_COURSES):
+        return ROMAN_COURSES[course_num - 1]
+    return str(course_num)
+
+
+def parse_course(value):
+    """Номер курса из строки "3" или "III". Возвращает None, если разобрать не удалось"""
+    value = str(value).strip().upper()
+    if value in ROMAN_COURSES:
+        return ROMAN_COURSES.index(value) + 1
+    if value.isdigit() and int(value) > 0:
+        return int(value)
+    return None
+
+
+def course_number_expression(start_year_field):
+    """SQL-выражение номера курса по году начала обучения (NULL, если обучение еще не началось)"""
+    academic_year = current_academic_year()
+    return models.Case(
+        models.When(**{f'{start_year_field}__gt': academic_year}, then=models.Value(None)),
+        default=models.Value(academic_year + 1) - models.F(start_year_field),
+        output_field=models.IntegerField(),
+    )
+
+
+class StudentQuerySet(SoftDeleteQuerySet):
+    def with_course(self):
+        """
+        Добавляет course_number - номер курса, посчитанный в БД
+        по group__start_year. По нему можно фильтровать и сортировать.
+        """
+        return self.annotate(course_number=course_number_expression('group__start_year'))
+
+
+class Student(PhotoMixin, BaseModel):
     user = models.OneToOneField(
         User,
         on_delete=models.PROTECT,
@@ -631,18 +986,9 @@ class Student(BaseModel):
         null=True,
         blank=True,
     )
-    photo = ProcessedImageField(
+    # Оригинал сохраняется сразу, сжатие до 800x800 выполняет фоновый обработчик (app.photos)
+    photo = models.ImageField(
         upload_to='students/photos/',
-        processors=[
-            Transpose(),  # Автоматический поворот по EXIF (если фото с телефона)
-            ResizeToFit(800, 800),  # Максимальный размер 800x800 пикселей
-        ],
-        format='JPEG',
-        options={
-            'quality': 75,
-            'optimize': True,
-            'progressive': True,
-        },
         verbose_name='Фотография студента',
         help_text='Загрузите фотографию. Она будет автоматически сжата до 800x800 пикселей',
         validators=[
@@ -651,6 +997,14 @@ class Student(BaseModel):
         blank=True,
         null=True,
     )
+    photo_status = models.CharField(
+        max_length=10,
+        choices=PHOTO_STATUS_CHOICES,
+        default=PHOTO_STATUS_NONE,
+        verbose_name='Обработка фотографии',
+        help_text='Состояние фоновой обработки фотографии',
+        editable=False,
+    )
     birth_date = models.DateField(
         verbose_name='Дата рождения',
         help_text='Введите дату рождения',
@@ -675,6 +1029,8 @@ class Student(BaseModel):
         help_text='Выберите группу',
     )
 
+    objects = SoftDeleteManager.from_queryset(StudentQuerySet)()
+    all_objects = StudentQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Студент'
@@ -684,7 +1040,10 @@ class Student(BaseModel):
             models.Index(fields=['name']),
             models.Index(fields=['lastname']),
             models.Index(fields=['user']),
-            models.Index(fields=['is_deleted', 'name', 'lastname', 'middlename']),
+            # Совпадает с ordering и курсором списка студентов (name, lastname, id)
+            active_index(fields=['name', 'lastname', 'id'], name='student_active_name_idx'),
+            active_index(fields=['group', 'name', 'lastname'], name='student_active_group_idx'),
+            fio_trigram_index(name='student_fio_trgm_idx'),
         ]
 
     @property
@@ -705,27 +1064,6 @@ class Student(BaseModel):
     def __str__(self):
         return self.full_name
 
-    def save(self, *args, **kwargs):
-        """Удаляем старое фото при обновлении"""
-        if self.pk:  # Если объект уже существует
-            try:
-                old_student = Student.objects.get(pk=self.pk)
-                if old_student.photo and old_student.photo != self.photo:
-                    # Удаляем старый файл
-                    if os.path.exists(old_student.photo.path):
-                        os.remove(old_student.photo.path)
-            except Student.DoesNotExist:
-                pass
-
-        super().save(*args, **kwargs)
-
-    def delete(self, *args, **kwargs):
-        """Удаляем файл фото при удалении"""
-        if self.photo:
-            if os.path.exists(self.photo.path):
-                os.remove(self.photo.path)
-        super().delete(*args, **kwargs)
-
     def clean(self):
         """Валидация размера файла"""
         super().clean()
@@ -747,40 +1085,22 @@ class Student(BaseModel):
         III курс: третий учебный год
         IV курс: четвертый учебный год
         """
+        # Если курс уже посчитан в SQL (StudentQuerySet.with_course), берем его
+        if hasattr(self, 'course_number'):
+            return course_to_roman(self.course_number)
+
         if not self.group or not self.group.start_year:
             return None
 
-        now = timezone.now()
-        current_year = now.year
-        current_month = now.month
-
-        # Определяем начало текущего учебного года
-        # Если сейчас сентябрь (9) или позже - учебный год начался в этом году
-        # Если август (8) или раньше - учебный год начался в прошлом году
-        if current_month >= 9:  # Сентябрь-декабрь
-            academic_year_start = current_year
-        else:  # Январь-август
-            academic_year_start = current_year - 1
-
         # Вычисляем курс
-        years_diff = academic_year_start - self.group.start_year
+        years_diff = current_academic_year() - self.group.start_year
 
         # Если учебный год еще не начался
         if years_diff < 0:
             return None
 
-        # Конвертируем в римские цифры
-        roman_courses = ['I', 'II', 'III', 'IV', 'V', 'VI']
-
         # Нумерация курсов с 1
-        course_num = years_diff + 1
-
-        # Возвращаем римскую цифру, если курс в пределах списка
-        if course_num <= len(roman_courses):
-            return roman_courses[course_num - 1]
-
-        # Если курс больше 6, возвращаем арабскую цифру
-        return str(course_num)
+        return course_to_roman(years_diff + 1)
 
     @property
     def course_display(self):
@@ -789,3 +1109,23 @@ class Student(BaseModel):
         if course is None:
             return "—"
         return f"{course} курс"
+
+
+class IssuedCertificate(models.Model):
+    """Журнал выданных справок. Номер справки - первичный ключ из последовательности БД"""
+    student = models.ForeignKey(
+        'Student',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='certificates',
+        verbose_name='Студент',
+    )
+    issued_at = models.DateTimeField(default=timezone.now, verbose_name='Дата выдачи')
+
+    class Meta:
+        verbose_name = 'Выданная справка'
+        verbose_name_plural = 'Выданные справки'
+        ordering = ['pk']
+
+    def __str__(self):
+        return f'Справка № {self.pk}'
@@ -0,0 +1,111 @@
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+class KeysetPagination:
+    """
+    Курсорная (keyset) пагинация.
+    Вместо OFFSET следующая страница выбирается условием
+    "строго после последней записи" по полям сортировки,
+    поэтому стоимость запроса не зависит от номера страницы.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 50
+    max_limit = 500
+
+    def __init__(self, ordering):
+        # Последним полем обязательно должен идти уникальный ключ (id),
+        # иначе курсор неоднозначен при одинаковых ФИО.
+        # Поле с минусом ('-name') сортируется по убыванию
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in self.ordering)
+
+    def is_requested(self, request):
+        # Пагинация включается, если клиент передал курсор или лимит
+        params = request.query_params
+        return self.cursor_query_param in params or self.limit_query_param in params
+
+    def get_limit(self, request):
+        raw = request.query_params.get(self.limit_query_param)
+        if raw is None:
+            return self.default_limit
+        try:
+            limit = int(raw)
+        except ValueError:
+            raise ValidationError({self.limit_query_param: 'Должно быть целым числом'})
+        if limit < 1:
+            raise ValidationError({self.limit_query_param: 'Должно быть больше нуля'})
+        return min(limit, self.max_limit)
+
+    def encode_cursor(self, obj):
+        # obj - экземпляр модели или уже сериализованная строка (словарь)
+        if isinstance(obj, dict):
+            values = [obj[field] for field in self.fields]
+        else:
+            values = [getattr(obj, field) for field in self.fields]
+        raw = json.dumps(values, ensure_ascii=False, default=str).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError):
+            raise ValidationError({self.cursor_query_param: 'Некорректный курсор'})
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValidationError({self.cursor_query_param: 'Некорректный курсор'})
+        return values
+
+    def build_after_filter(self, values):
+        # (a, b, c) > (x, y, z)  ->  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        # Для полей по убыванию сравнение обратное (<)
+        condition = Q()
+        for i, (field, ordering) in enumerate(zip(self.fields, self.ordering)):
+            lookup = 'lt' if ordering.startswith('-') else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_field, prev_value in zip(self.fields[:i], values[:i]):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return condition
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Queryset страницы (на одну запись больше лимита) и сам лимит.
+        Лишняя запись нужна, чтобы понять, есть ли следующая страница.
+        """
+        limit = self.get_limit(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.build_after_filter(self.decode_cursor(cursor)))
+        return queryset[:limit + 1], limit
+
+    def split_page(self, rows, limit):
+        """Обрезает страницу до лимита и возвращает курсор следующей страницы"""
+        rows = list(rows)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, self.encode_cursor(rows[-1])
+        return rows, None
+
+    def paginate_queryset(self, queryset, request):
+        """Возвращает список объектов страницы и курсор следующей страницы."""
+        page, limit = self.get_page_queryset(queryset, request)
+        return self.split_page(page, limit)
+
+    def get_next_link(self, request, next_cursor):
+        if next_cursor is None:
+            return None
+        params = request.query_params.copy()
+        params[self.cursor_query_param] = next_cursor
+        return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+    def get_paginated_data(self, request, results, next_cursor):
+        return {
+            'next': self.get_next_link(request, next_cursor),
+            'results': results,
+        }
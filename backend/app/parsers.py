@@ -0,0 +1,26 @@
+import csv
+import io
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def read_csv_rows(stream, encoding='utf-8-sig'):
+    """Читает CSV (первая строка - заголовок) в список словарей"""
+    try:
+        text = io.StringIO(stream.read().decode(encoding), newline='')
+        rows = []
+        for row in csv.DictReader(text):
+            # Пустые ячейки считаем отсутствующими значениями
+            rows.append({key.strip(): value.strip() for key, value in row.items()
+                         if key and value not in (None, '')})
+        return rows
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ParseError(f'Ошибка разбора CSV: {exc}')
+
+
+class CSVParser(BaseParser):
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return read_csv_rows(stream)
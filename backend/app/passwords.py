@@ -0,0 +1,46 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# Меньшие пачки быстрее захешировать в текущем процессе, чем поднимать пул
+POOL_THRESHOLD = 20
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker():
+    # При запуске через spawn дочерний процесс стартует без настроенного Django
+    django.setup()
+
+
+def get_executor():
+    """
+    Общий пул процессов для хеширования (PASSWORD_HASH_WORKERS процессов), создается при первой пачке.
+    Одновременные зачисления делят его, а не запускают каждое свой пул.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, settings.PASSWORD_HASH_WORKERS), initializer=_init_worker,
+            )
+        return _executor
+
+
+def hash_passwords(passwords):
+    """
+    Хеширует список паролей (PBKDF2 и т.п.) в пуле процессов.
+    Хеширование упирается в CPU, поэтому потоки здесь не помогают из-за GIL.
+    Порядок результатов совпадает с порядком паролей.
+    """
+    passwords = list(passwords)
+    if len(passwords) < POOL_THRESHOLD:
+        return [make_password(password) for password in passwords]
+
+    workers = max(1, settings.PASSWORD_HASH_WORKERS)
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(get_executor().map(make_password, passwords, chunksize=chunksize))
@@ -0,0 +1,157 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import PhotoJob, PHOTO_STATUS_READY, PHOTO_STATUS_FAILED
+from .renditions import build_renditions, invalidate_renditions
+
+logger = logging.getLogger(__name__)
+
+# Те же параметры, что раньше были у ProcessedImageField
+PHOTO_MAX_SIZE = (800, 800)  # Максимальный размер 800x800 пикселей
+PHOTO_FORMAT = 'JPEG'
+PHOTO_OPTIONS = {
+    'quality': 75,
+    'optimize': True,
+    'progressive': True,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Пул потоков обработки фото (один на процесс). Pillow отпускает GIL при сжатии"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PHOTO_WORKERS,
+                thread_name_prefix='photo-worker',
+            )
+        return _executor
+
+
+def enqueue_photo(instance):
+    """Ставит фото записи в очередь; обработка начнется после коммита транзакции"""
+    job = PhotoJob.objects.create(model_label=instance._meta.label_lower, object_id=instance.pk)
+    if settings.PHOTO_WORKERS > 0:
+        transaction.on_commit(lambda: get_executor().submit(_run_in_worker, job.pk))
+    return job
+
+
+def _run_in_worker(job_id):
+    try:
+        run_job(job_id)
+    except Exception:
+        logger.exception('Ошибка обработки фото, задача %s', job_id)
+    finally:
+        # У каждого потока пула свое соединение с БД, не оставляем его открытым
+        connection.close()
+
+
+def compress_image(image):
+    """Поворот по EXIF (если фото с телефона), уменьшение и перевод в RGB для JPEG"""
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(PHOTO_MAX_SIZE, Image.LANCZOS)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+
+def process_photo(instance):
+    """Сжимает оригинал фото и заменяет им файл записи. Возвращает новое имя файла"""
+    field = instance.photo
+    original_name = field.name
+    storage = field.storage
+
+    with storage.open(original_name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    image = compress_image(image)
+
+    buffer = io.BytesIO()
+    image.save(buffer, PHOTO_FORMAT, **PHOTO_OPTIONS)
+    new_name = storage.save(
+        os.path.splitext(original_name)[0] + '.jpg',
+        ContentFile(buffer.getvalue()),
+    )
+
+    # Обновляем только если за время обработки фото не заменили
+    updated = type(instance).all_objects.filter(pk=instance.pk, photo=original_name).update(
+        photo=new_name,
+        photo_status=PHOTO_STATUS_READY,
+    )
+    if not updated:
+        storage.delete(new_name)
+        return None
+    if new_name != original_name:
+        storage.delete(original_name)
+
+    # Превью, построенные по необработанному оригиналу, больше не нужны
+    model_name = instance._meta.model_name
+    invalidate_renditions(model_name, instance.pk, storage=storage)
+    try:
+        build_renditions(model_name, instance.pk, new_name, storage=storage)
+    except Exception:
+        # Не критично: превью построятся при первом запросе
+        logger.exception('Не удалось построить превью %s#%s', model_name, instance.pk)
+    return new_name
+
+
+def run_job(job_id):
+    """Выполняет задачу, если ее еще никто не взял. Возвращает True, если задача выполнена"""
+    now = timezone.now()
+    claimed = PhotoJob.objects.filter(pk=job_id, status=PhotoJob.STATUS_PENDING).update(
+        status=PhotoJob.STATUS_PROCESSING,
+        started_at=now,
+        attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return False
+
+    job = PhotoJob.objects.get(pk=job_id)
+    model = apps.get_model(job.model_label)
+    try:
+        instance = model.all_objects.get(pk=job.object_id)
+        if instance.photo:
+            process_photo(instance)
+    except Exception as exc:
+        logger.exception('Не удалось обработать фото %s#%s', job.model_label, job.object_id)
+        model.all_objects.filter(pk=job.object_id).update(photo_status=PHOTO_STATUS_FAILED)
+        PhotoJob.objects.filter(pk=job_id).update(
+            status=PhotoJob.STATUS_FAILED,
+            error=str(exc),
+            finished_at=timezone.now(),
+        )
+        return False
+
+    PhotoJob.objects.filter(pk=job_id).update(status=PhotoJob.STATUS_DONE, finished_at=timezone.now())
+    return True
+
+
+def requeue_stale(older_than=timedelta(minutes=10)):
+    """Возвращает в очередь задачи, зависшие в обработке (например, после перезапуска процесса)"""
+    return PhotoJob.objects.filter(
+        status=PhotoJob.STATUS_PROCESSING,
+        started_at__lt=timezone.now() - older_than,
+    ).update(status=PhotoJob.STATUS_PENDING)
+
+
+def process_pending(limit=None):
+    """Обрабатывает задачи из очереди в текущем процессе. Возвращает количество выполненных"""
+    job_ids = PhotoJob.objects.filter(status=PhotoJob.STATUS_PENDING).values_list('pk', flat=True)
+    if limit:
+        job_ids = job_ids[:limit]
+    return sum(run_job(job_id) for job_id in list(job_ids))
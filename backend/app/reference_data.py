@@ -0,0 +1,87 @@
+import threading
+import time
+
+from .conditional import collection_state
+from .db_routers import read_from_replica
+from . import versions
+
+VERSION_KEY = 'reference_data:version'
+# Страховка: снимок перечитывается не реже раза в минуту, даже если версия не изменилась
+# (общий кэш по умолчанию лежит в файлах на своем хосте, другие хосты его сброс не видят)
+SNAPSHOT_TTL = 60
+
+
+def bump_version():
+    """Сообщает всем процессам, что справочники изменились"""
+    versions.bump_version(VERSION_KEY)
+
+
+def current_version():
+    return versions.current_version(VERSION_KEY)
+
+
+class ReferenceSnapshot:
+    """Неизменяемый снимок справочников: готовые ответы списков и словари id -> значение"""
+
+    def __init__(self, version):
+        from .models import Region, City, Role
+
+        self.version = version
+        self.expires_at = time.monotonic() + SNAPSHOT_TTL
+
+        regions = list(Region.all_objects.values_list('id', 'name', 'is_deleted'))
+        # Как и city.region.name, имя берется и у мягко удаленного региона
+        self.region_names = {pk: name for pk, name, _ in regions}
+        # Формат совпадает с RegionSerializer / CityValuesSerializer / RoleValuesSerializer
+        self.regions = [{'name': name} for _, name, is_deleted in regions if not is_deleted]
+
+        self.cities = [
+            {'id': pk, 'name': name, 'region_name': self.region_names.get(region_id)}
+            for pk, name, region_id in City.objects.values_list('id', 'name', 'region_id')
+        ]
+
+        self.roles = [{'id': pk, 'name': name} for pk, name in Role.objects.order_by('pk').values_list('id', 'name')]
+
+        # ETag и Last-Modified списков считаются один раз при сборке снимка
+        self.states = {
+            'regions': collection_state(Region),
+            'cities': collection_state(City, related=['region']),
+            'roles': collection_state(Role),
+        }
+
+    def is_current(self, version):
+        return self.version == version and time.monotonic() < self.expires_at
+
+
+class ReferenceData:
+    """
+    Кэш справочников (Region, City, Role) в памяти процесса.
+    На каждом обращении сверяется только номер версии в общем кэше,
+    снимок перестраивается, когда версию увеличил сигнал об изменении,
+    или по истечении SNAPSHOT_TTL.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        version = current_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.is_current(version):
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or not self._snapshot.is_current(version):
+                # Снимок живет до следующего изменения: отставшая реплика закрепила бы старые строки
+                with read_from_replica(False):
+                    self._snapshot = ReferenceSnapshot(version)
+            return self._snapshot
+
+    def clear(self):
+        self._snapshot = None
+
+    def region_name(self, region_id):
+        return self.snapshot().region_names.get(region_id)
+
+
+reference_data = ReferenceData()
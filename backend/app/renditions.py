@@ -0,0 +1,149 @@
+import hashlib
+import io
+from functools import lru_cache
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Именованные размеры превью: имя -> максимальная сторона, px
+RENDITIONS = {
+    'thumb': 64,
+    'small': 160,
+    'medium': 400,
+}
+
+# Форматы превью: имя -> (формат Pillow, расширение, content-type, параметры сохранения)
+RENDITION_FORMATS = {
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg', {'quality': 80, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 4}),
+}
+
+# Модели с фотографиями, для которых строятся превью (имя в URL -> путь модели)
+RENDITION_MODELS = {
+    'student': 'app.Student',
+    'teacher': 'app.Teacher',
+}
+
+RENDITIONS_ROOT = 'renditions'
+
+
+def photo_version(photo_name):
+    """
+    Короткий хэш имени файла фото: сбрасывает кэш браузера при замене фото.
+    Имя содержит хэш содержимого (name_photo_by_content), поэтому другое фото
+    никогда не получит прежнюю версию, даже если старый файл уже удален.
+    """
+    return hashlib.md5(photo_name.encode('utf-8')).hexdigest()[:10]
+
+
+def rendition_dir(model_name, pk):
+    return posixpath.join(RENDITIONS_ROOT, model_name, str(pk))
+
+
+def rendition_path(model_name, pk, photo_name, rendition, fmt):
+    extension = RENDITION_FORMATS[fmt][1]
+    return posixpath.join(
+        rendition_dir(model_name, pk), photo_version(photo_name), f'{rendition}.{extension}',
+    )
+
+
+def rendition_urls(model_name, pk, photo_name):
+    """
+    URL превью для сериализаторов: {'thumb': ..., 'small': ..., 'medium': ...}.
+    Без фото значения None, набор ключей не меняется (важно для CSV-выгрузки).
+    Формат (JPEG или WebP) выбирается по заголовку Accept при запросе картинки.
+    """
+    if not photo_name:
+        return dict.fromkeys(RENDITIONS)
+    version = photo_version(photo_name)
+    return {
+        rendition: template.format(pk=pk, version=version)
+        for rendition, template in rendition_url_templates(model_name).items()
+    }
+
+
+# pk-заглушка для reverse: в URL превью других чисел нет
+_PK_PLACEHOLDER = 987654321
+
+
+@lru_cache(maxsize=None)
+def rendition_url_templates(model_name):
+    """Шаблоны URL превью модели, reverse вызывается один раз, а не на каждую строку списка"""
+    return {
+        rendition: reverse('photo-rendition', args=(model_name, _PK_PLACEHOLDER, rendition))
+        .replace(str(_PK_PLACEHOLDER), '{pk}') + '?v={version}'
+        for rendition in RENDITIONS
+    }
+
+
+def render_rendition(source, rendition, fmt):
+    """Уменьшает открытое изображение до размера rendition и возвращает байты в формате fmt"""
+    pil_format, _, _, options = RENDITION_FORMATS[fmt]
+    size = RENDITIONS[rendition]
+    image = source.copy()
+    image.thumbnail((size, size), Image.LANCZOS)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def _save_once(storage, path, data):
+    # Превью могли одновременно построить в другом запросе: оставляем первое
+    if storage.exists(path):
+        return path
+    saved = storage.save(path, ContentFile(data))
+    if saved != path:
+        storage.delete(saved)
+    return path
+
+
+def get_rendition(model_name, pk, photo_name, rendition, fmt, storage=default_storage):
+    """Путь к превью в хранилище. Строится при первом обращении и дальше берется с диска"""
+    path = rendition_path(model_name, pk, photo_name, rendition, fmt)
+    if storage.exists(path):
+        return path
+    with storage.open(photo_name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    return _save_once(storage, path, render_rendition(image, rendition, fmt))
+
+
+def build_renditions(model_name, pk, photo_name, storage=default_storage):
+    """Строит все превью фото заранее (вызывается фоновым обработчиком фото)"""
+    with storage.open(photo_name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    for rendition in RENDITIONS:
+        for fmt in RENDITION_FORMATS:
+            path = rendition_path(model_name, pk, photo_name, rendition, fmt)
+            _save_once(storage, path, render_rendition(image, rendition, fmt))
+
+
+def _delete_tree(storage, path):
+    try:
+        dirs, files = storage.listdir(path)
+    except FileNotFoundError:
+        return
+    for name in files:
+        storage.delete(posixpath.join(path, name))
+    for name in dirs:
+        _delete_tree(storage, posixpath.join(path, name))
+
+
+def invalidate_renditions(model_name, pk, photo_name=None, storage=default_storage):
+    """Удаляет превью записи: только для фото photo_name или все (при удалении записи)"""
+    path = rendition_dir(model_name, pk)
+    if photo_name:
+        path = posixpath.join(path, photo_version(photo_name))
+    try:
+        _delete_tree(storage, path)
+    except OSError:
+        logger.exception('Не удалось удалить превью %s#%s', model_name, pk)
@@ -0,0 +1,98 @@
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Greatest
+
+from .models import Student, Teacher
+from .serializers.values_serializers import full_name
+
+# Поля ФИО, по которым построены GIN-индексы gin_trgm_ops (student/teacher_fio_trgm_idx)
+SEARCH_FIELDS = ('lastname', 'name', 'middlename')
+# Больше слов в ФИО не бывает, лишние только замедляют запрос
+MAX_WORDS = 3
+MIN_WORD_LENGTH = 2
+
+
+def use_trigram():
+    # pg_trgm есть только в PostgreSQL; на остальных БД (тесты на SQLite) - поиск по подстроке
+    return connection.vendor == 'postgresql'
+
+
+def split_query(query):
+    """Слова запроса длиной от MIN_WORD_LENGTH символов"""
+    return [word for word in query.split() if len(word) >= MIN_WORD_LENGTH][:MAX_WORDS]
+
+
+def word_filter(word):
+    """
+    Одно слово совпадает с фамилией, именем или отчеством.
+    На PostgreSQL: похожесть по триграммам (оператор %, устойчив к опечаткам)
+    или начало фамилии/имени (короткие префиксы у триграмм дают низкую похожесть).
+    """
+    if not use_trigram():
+        return reduce(or_, (Q(**{f'{field}__icontains': word}) for field in SEARCH_FIELDS))
+    prefix = word[:1].upper() + word[1:]
+    return (
+        reduce(or_, (Q(**{f'{field}__trigram_similar': word}) for field in SEARCH_FIELDS))
+        | Q(lastname__startswith=prefix)
+        | Q(name__startswith=prefix)
+    )
+
+
+def search_filter(words):
+    """Все слова запроса должны найтись в ФИО"""
+    return reduce(lambda condition, word: condition & word_filter(word), words, Q())
+
+
+def rank_expression(words):
+    """Релевантность: средняя по словам наибольшая похожесть слова на одно из полей ФИО"""
+    if not use_trigram():
+        return Value(1.0, output_field=FloatField())
+    total = None
+    for word in words:
+        best = Greatest(*(TrigramSimilarity(field, word) for field in SEARCH_FIELDS))
+        total = best if total is None else total + best
+    return total / Value(float(len(words)), output_field=FloatField())
+
+
+def search_queryset(queryset, query):
+    """Фильтр и аннотация rank для queryset студентов или преподавателей; None, если запрос пустой"""
+    words = split_query(query)
+    if not words:
+        return None
+    return queryset.filter(search_filter(words)).annotate(rank=rank_expression(words))
+
+
+def search_people(query, types=('student', 'teacher'), limit=20):
+    """
+    Студенты и преподаватели по ФИО, самые похожие первыми.
+    Каждая модель - один запрос по GIN-индексу с LIMIT, затем слияние по rank.
+    """
+    results = []
+    if 'student' in types:
+        students = search_queryset(Student.objects.all(), query)
+        if students is not None:
+            rows = students.order_by('-rank', 'lastname', 'id').values_list(
+                'id', 'lastname', 'name', 'middlename', 'group__name', 'rank',
+            )[:limit]
+            results += [
+                {'type': 'student', 'id': pk, 'full_name': full_name(lastname, name, middlename),
+                 'group_name': group_name, 'rank': round(rank, 3)}
+                for pk, lastname, name, middlename, group_name, rank in rows
+            ]
+    if 'teacher' in types:
+        teachers = search_queryset(Teacher.objects.all(), query)
+        if teachers is not None:
+            rows = teachers.order_by('-rank', 'lastname', 'id').values_list(
+                'id', 'lastname', 'name', 'middlename', 'rank',
+            )[:limit]
+            results += [
+                {'type': 'teacher', 'id': pk, 'full_name': full_name(lastname, name, middlename),
+                 'group_name': None, 'rank': round(rank, 3)}
+                for pk, lastname, name, middlename, rank in rows
+            ]
+    results.sort(key=lambda row: -row['rank'])
+    return results[:limit]
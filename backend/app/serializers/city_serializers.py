@@ -1,15 +1,21 @@
 from rest_framework import serializers
 from ..models import City
 from rest_framework.validators import UniqueTogetherValidator
+from .values_serializers import ValuesSerializer
+from ..reference_data import reference_data
 
 
 class CitySerializer(serializers.ModelSerializer):
-    region_name = serializers.CharField(source='region.name', read_only=True)
+    region_name = serializers.SerializerMethodField()
 
     class Meta:
         model = City
         fields = ['id', 'name', 'region_name']
 
+    def get_region_name(self, obj):
+        # Из кэша справочников, без запроса region на каждый город
+        return reference_data.region_name(obj.region_id)
+
 
 class CityCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -21,3 +27,12 @@ class CityCreateSerializer(serializers.ModelSerializer):
                 fields=['name', 'region']
             )
         ]
+
+
+class CityValuesSerializer(ValuesSerializer):
+    """Быстрый аналог CitySerializer для списков"""
+    columns = ('id', 'name', 'region__name')
+
+    def to_representation(self, row):
+        pk, name, region_name = row
+        return {'id': pk, 'name': name, 'region_name': region_name}
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from ..models import Role
+from .values_serializers import ValuesSerializer
 
 
 class RoleSerializer(serializers.ModelSerializer):
@@ -18,3 +19,12 @@ class RoleCreateSerializer(serializers.ModelSerializer):
         if Role.objects.filter(name=value).exists():
             raise serializers.ValidationError('Роль с таким названием уже существует')
         return value
+
+
+class RoleValuesSerializer(ValuesSerializer):
+    """Быстрый аналог RoleSerializer для списков"""
+    columns = ('id', 'name')
+
+    def to_representation(self, row):
+        pk, name = row
+        return {'id': pk, 'name': name}
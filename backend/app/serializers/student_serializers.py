@@ -1,20 +1,28 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db import transaction
 from .user_serializers import UserSerializer
-from ..models import Student
+from .values_serializers import ValuesSerializer, full_name, file_url, iso_date
+from ..renditions import rendition_urls
+from ..models import Student, Group, course_to_roman
+from ..passwords import hash_passwords
 
 
 class StudentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    photo_renditions = serializers.SerializerMethodField()
     group_name = serializers.CharField(source='group.name', read_only=True)
     course_display = serializers.CharField(read_only=True)
 
     class Meta:
         model = Student
         fields = ['id', 'user', 'lastname', 'name', 'middlename', 'full_name',
-                  'photo', 'birth_date', 'phone', 'city', 'group', 'group_name',
+                  'photo', 'photo_renditions', 'birth_date', 'phone', 'city', 'group', 'group_name',
                   'course', 'course_display']
 
+    def get_photo_renditions(self, obj):
+        return rendition_urls('student', obj.pk, obj.photo.name)
+
 
 class StudentCreateSerializer(serializers.ModelSerializer):
     username = serializers.CharField(write_only=True)
@@ -44,4 +52,114 @@ class StudentCreateSerializer(serializers.ModelSerializer):
         )
 
         student = Student.objects.create(user=user, **validated_data)
-        return student
\ No newline at end of file
+        return student
+
+
+class StudentBulkListSerializer(serializers.ListSerializer):
+    """
+    Массовое зачисление: сначала проверяются все строки, затем
+    пользователи и студенты создаются через bulk_create в одной транзакции.
+    """
+    max_rows = 5000
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            raise serializers.ValidationError({
+                'non_field_errors': ['Ожидается непустой список студентов']
+            })
+        if len(data) > self.max_rows:
+            raise serializers.ValidationError({
+                'non_field_errors': [f'Не более {self.max_rows} студентов за один запрос']
+            })
+
+        rows, errors = [], []
+        for item in data:
+            try:
+                rows.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                rows.append(None)
+                errors.append(exc.detail)
+
+        # Проверки, которым нужна БД, делаем одним запросом на всю пачку
+        valid_rows = [row for row in rows if row is not None]
+        taken = set(User.objects.filter(
+            username__in=[row['username'] for row in valid_rows]
+        ).values_list('username', flat=True))
+        groups = Group.objects.in_bulk({row['group_id'] for row in valid_rows})
+
+        seen = set()
+        for row, row_errors in zip(rows, errors):
+            if row is None:
+                continue
+            username = row['username']
+            if username in taken or username in seen:
+                row_errors['username'] = ['Пользователь с таким именем уже существует']
+            seen.add(username)
+            if row['group_id'] not in groups:
+                row_errors['group'] = ['Группа не найдена']
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+    def create(self, validated_data):
+        hashes = hash_passwords(row.pop('password') for row in validated_data)
+
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(username=row.pop('username'), password=password_hash)
+                for row, password_hash in zip(validated_data, hashes)
+            ])
+            students = Student.objects.bulk_create([
+                Student(user=user, **row)
+                for user, row in zip(users, validated_data)
+            ])
+        return students
+
+
+class StudentBulkCreateSerializer(serializers.ModelSerializer):
+    """Одна строка массового зачисления (без фотографии)"""
+    username = serializers.CharField(write_only=True, max_length=150)
+    password = serializers.CharField(write_only=True)
+    # Группы проверяются одним запросом в StudentBulkListSerializer
+    group = serializers.IntegerField(source='group_id')
+
+    class Meta:
+        model = Student
+        fields = ['username', 'password', 'lastname', 'name',
+                  'middlename', 'birth_date', 'phone', 'group']
+        list_serializer_class = StudentBulkListSerializer
+
+
+class StudentValuesSerializer(ValuesSerializer):
+    """
+    Быстрый аналог StudentSerializer для списков.
+    Ожидает queryset с аннотацией course_number (StudentQuerySet.with_course).
+    """
+    columns = ('id', 'user_id', 'user__username', 'lastname', 'name', 'middlename',
+               'photo', 'birth_date', 'phone', 'city_id', 'group_id', 'group__name',
+               'course_number')
+
+    def to_representation(self, row):
+        (pk, user_id, username, lastname, name, middlename, photo, birth_date,
+         phone, city_id, group_id, group_name, course_number) = row
+        course = course_to_roman(course_number)
+        return {
+            'id': pk,
+            'user': {'id': user_id, 'username': username},
+            'lastname': lastname,
+            'name': name,
+            'middlename': middlename,
+            'full_name': full_name(lastname, name, middlename),
+            'photo': file_url(photo),
+            'photo_renditions': rendition_urls('student', pk, photo),
+            'birth_date': iso_date(birth_date),
+            # В БД телефон хранится уже в формате E.164 - так же его отдает PhoneNumber
+            'phone': phone,
+            'city': city_id,
+            'group': group_id,
+            'group_name': group_name,
+            'course': course,
+            'course_display': "—" if course is None else f"{course} курс",
+        }
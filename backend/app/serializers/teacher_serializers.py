@@ -2,15 +2,21 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from ..models import Teacher
 from .user_serializers import UserSerializer
+from .values_serializers import ValuesSerializer, full_name, file_url, iso_date
+from ..renditions import rendition_urls
 
 
 class TeacherSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    photo_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Teacher
         fields = ['id', 'user', 'lastname', 'name', 'middlename', 'full_name',
-                  'photo', 'birth_date', 'phone']
+                  'photo', 'photo_renditions', 'birth_date', 'phone']
+
+    def get_photo_renditions(self, obj):
+        return rendition_urls('teacher', obj.pk, obj.photo.name)
 
 
 class TeacherCreateSerializer(serializers.ModelSerializer):
@@ -32,4 +38,25 @@ class TeacherCreateSerializer(serializers.ModelSerializer):
         )
 
         teacher = Teacher.objects.create(user=user, **validated_data)
-        return teacher
\ No newline at end of file
+        return teacher
+
+
+class TeacherValuesSerializer(ValuesSerializer):
+    """Быстрый аналог TeacherSerializer для списков"""
+    columns = ('id', 'user_id', 'user__username', 'lastname', 'name', 'middlename',
+               'photo', 'birth_date', 'phone')
+
+    def to_representation(self, row):
+        pk, user_id, username, lastname, name, middlename, photo, birth_date, phone = row
+        return {
+            'id': pk,
+            'user': {'id': user_id, 'username': username},
+            'lastname': lastname,
+            'name': name,
+            'middlename': middlename,
+            'full_name': full_name(lastname, name, middlename),
+            'photo': file_url(photo),
+            'photo_renditions': rendition_urls('teacher', pk, photo),
+            'birth_date': iso_date(birth_date),
+            'phone': phone,
+        }
@@ -0,0 +1,67 @@
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+
+from ..metrics import timed
+
+
+class ValuesSerializer:
+    """
+    Легкий сериализатор только для чтения больших списков.
+    Строки берутся из queryset.values_list(*columns) и превращаются в словари
+    методом to_representation без полей DRF и экземпляров моделей.
+    Результат должен совпадать с ответом соответствующего ModelSerializer
+    байт в байт, включая порядок ключей.
+    """
+    columns = ()
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+    @property
+    def data(self):
+        to_representation = self.to_representation
+        # Время SQL учитывается отдельно (db), в serialize - только превращение строк в словари
+        rows = list(self.queryset.values_list(*self.columns))
+        with timed('serialize'):
+            return [to_representation(row) for row in rows]
+
+    async def adata(self):
+        """
+        То же, что data, для async-представлений.
+        Строки читаются одним переходом в sync_to_async: values_list().aiterator()
+        в Django 5.x выполняет запрос прямо в цикле событий (SynchronousOnlyOperation).
+        """
+        to_representation = self.to_representation
+        rows = await sync_to_async(list)(self.queryset.values_list(*self.columns))
+        with timed('serialize'):
+            return [to_representation(row) for row in rows]
+
+    def iter_data(self, chunk_size=2000):
+        """
+        Строки по одной, без загрузки всего списка в память.
+        На PostgreSQL iterator() читает через серверный курсор порциями по chunk_size.
+        """
+        to_representation = self.to_representation
+        for row in self.queryset.values_list(*self.columns).iterator(chunk_size=chunk_size):
+            yield to_representation(row)
+
+
+def full_name(lastname, name, middlename):
+    """То же, что свойство full_name у Student/Teacher"""
+    if middlename:
+        return f'{lastname} {name} {middlename}'
+    return f'{lastname} {name}'
+
+
+def file_url(name, storage=default_storage):
+    """То же, что ImageField DRF без request в контексте: относительный URL или None"""
+    if not name:
+        return None
+    return storage.url(name)
+
+
+def iso_date(value):
+    return value.isoformat() if value is not None else None
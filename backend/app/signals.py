@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import (
+    Region, City, Role, Group, Student, rows_changed,
+)
+from .reference_data import bump_version
+from .statistics import invalidate_group_statistics
+from .versions import bump_users_version
+
+REFERENCE_MODELS = (Region, City, Role)
+
+
+# Изменения пользователя (пароль, is_active и т.д.) сразу сбрасывают его из кэша аутентификации
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    user_cache.invalidate(str(instance.pk))
+
+
+# Логин пользователя выводится в списках студентов и преподавателей: меняем их ETag.
+# Вход в систему (update_fields=['last_login']) списки не затрагивает
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_lists(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    bump_users_version()
+    transaction.on_commit(bump_users_version)
+
+
+# Любое изменение справочников сбрасывает их кэш во всех процессах
+@receiver([post_save, post_delete, rows_changed])
+def invalidate_reference_data(sender, **kwargs):
+    if sender in REFERENCE_MODELS:
+        bump_version()
+        # Повторно после коммита: процесс, успевший перестроить снимок
+        # по еще не закоммиченным данным, перечитает справочники
+        transaction.on_commit(bump_version)
+
+
+# Поля студента, от которых зависит заполненность групп
+STATISTICS_STUDENT_FIELDS = {'group', 'group_id', 'is_deleted'}
+
+
+# Зачисление, перевод в другую группу и удаление студента, изменения групп
+# сбрасывают статистику заполненности (app.statistics)
+@receiver([post_save, post_delete, rows_changed])
+def invalidate_statistics(sender, **kwargs):
+    if sender not in (Student, Group):
+        return
+    # update_fields - у save(), fields - у массовых update/bulk_update
+    changed = kwargs.get('update_fields') or kwargs.get('fields')
+    if sender is Student and changed and not STATISTICS_STUDENT_FIELDS & set(changed):
+        return
+    invalidate_group_statistics()
+    transaction.on_commit(invalidate_group_statistics)
+
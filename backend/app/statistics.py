@@ -0,0 +1,103 @@
+from django.core.cache import caches
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .db_routers import read_from_replica
+from .models import Group, course_number_expression, course_to_roman, parse_course
+
+CACHE_KEY = 'group_statistics'
+# Короткое время жизни: даже если сигнал не сработал (изменение через SQL), данные скоро обновятся
+CACHE_TIMEOUT = 60
+
+
+def _shared_cache():
+    # Общий для процессов кэш: сброс после изменения виден всем воркерам
+    return caches['shared']
+
+
+def occupancy(students, capacity):
+    """Счетчики заполненности: студентов, мест, свободных мест и доля заполнения"""
+    return {
+        'students': students,
+        'capacity': capacity,
+        'free_places': max(capacity - students, 0),
+        'occupancy': round(students / capacity, 3) if capacity else None,
+    }
+
+
+def _rollup(rows, fields):
+    """Суммирует строки групп по полям fields (специальность, курс), сохраняя порядок появления"""
+    totals = {}
+    for row in rows:
+        key = tuple(row[field] for field in fields)
+        item = totals.setdefault(key, {'groups': 0, 'students': 0, 'capacity': 0})
+        item['groups'] += 1
+        item['students'] += row['students']
+        item['capacity'] += row['capacity']
+    return [
+        {**dict(zip(fields, key)), 'groups': item['groups'], **occupancy(item['students'], item['capacity'])}
+        for key, item in totals.items()
+    ]
+
+
+def build_group_statistics():
+    """
+    Заполненность активных групп одним запросом с GROUP BY,
+    сводки по специальностям и курсам считаются из его строк в Python.
+    """
+    groups = (
+        Group.objects.filter(is_active=True)
+        .annotate(
+            student_count=Count('student', filter=Q(student__is_deleted=False)),
+            course_number=course_number_expression('start_year'),
+        )
+        .order_by('speciality__name', 'start_year', 'name')
+        .values_list(
+            'id', 'name', 'speciality_id', 'speciality__name', 'course_number',
+            'max_students', 'student_count',
+        )
+    )
+
+    rows = [
+        {
+            'id': pk,
+            'name': name,
+            'speciality_id': speciality_id,
+            'speciality': speciality_name,
+            'course': course_to_roman(course_number),
+            **occupancy(student_count, max_students),
+        }
+        for pk, name, speciality_id, speciality_name, course_number, max_students, student_count in groups
+    ]
+    # Курсы по порядку, группы, еще не начавшие обучение (курс None), - в конце
+    courses = sorted(
+        _rollup(rows, ('course',)),
+        key=lambda item: (item['course'] is None, parse_course(item['course'] or 0) or 0),
+    )
+
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'total': {
+            'groups': len(rows),
+            **occupancy(sum(row['students'] for row in rows), sum(row['capacity'] for row in rows)),
+        },
+        'groups': rows,
+        'specialities': _rollup(rows, ('speciality_id', 'speciality')),
+        'courses': courses,
+    }
+
+
+def get_group_statistics():
+    """Статистика из кэша или свежая, если кэш пуст или сброшен"""
+    cache = _shared_cache()
+    data = cache.get(CACHE_KEY)
+    if data is None:
+        # Кэш общий для всех клиентов, поэтому собирается с основной базы, а не с отстающей реплики
+        with read_from_replica(False):
+            data = build_group_statistics()
+        cache.set(CACHE_KEY, data, CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_group_statistics():
+    _shared_cache().delete(CACHE_KEY)
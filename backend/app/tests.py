@@ -1,6 +1,53 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import date
+from unittest import mock, skipUnless
+from urllib.parse import parse_qsl, urlsplit
 
-from .models import Region, City
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .audit import audit_user
+from .certificates import certificate_students, certificate_template, issue_certificates, render_certificates_pdf
+from .datasets import clear_dataset, dataset_exists, generate_dataset
+from .db_routers import ReplicaRouter, read_from_replica
+from .filters import filter_students, STUDENT_ORDERINGS
+from .authentication import user_cache
+from .models import (
+    Role, Region, City, CodeSpeciality, Speciality, Qualification, Group, Student, Teacher,
+    PhotoJob, IssuedCertificate, current_academic_year,
+)
+from .metrics import Histogram, collect_metrics, registry as metrics_registry
+from .middleware import ReplicaRoutingMiddleware
+from .passwords import POOL_THRESHOLD, get_executor as get_password_executor, hash_passwords
+from .photos import process_pending
+from .renditions import RENDITIONS, rendition_url_templates
+from .reference_data import SNAPSHOT_TTL, reference_data
+from .search import search_people
+from .statistics import invalidate_group_statistics
+from .serializers.city_serializers import CitySerializer, CityValuesSerializer
+from .serializers.role_serializers import RoleSerializer, RoleValuesSerializer
+from .serializers.student_serializers import StudentSerializer, StudentValuesSerializer
+from .serializers.teacher_serializers import TeacherSerializer, TeacherValuesSerializer
 
 
 class RegionModelTest(TestCase):
@@ -27,3 +74,1244 @@ class CityModelTest(TestCase):
         self.assertEqual(city.name, 'Альметьевск')
         self.assertEqual(city.region, self.region)
 
+
+class StudentsDataMixin:
+    # Общие тестовые данные: специальность, квалификация и группа
+    def create_group(self, name='ИС-21', start_year=2021):
+        code, _ = CodeSpeciality.objects.get_or_create(code='09.02.07')
+        speciality, _ = Speciality.objects.get_or_create(code=code, defaults={'name': 'Информационные системы'})
+        qualification, _ = Qualification.objects.get_or_create(
+            speciality=speciality, name='Программист', based='9',
+        )
+        return Group.objects.create(
+            name=name,
+            speciality=speciality,
+            qualification=qualification,
+            start_year=start_year,
+        )
+
+    def create_students(self, group, count, prefix='Студент'):
+        students = []
+        for i in range(count):
+            user = User.objects.create(username=f'{prefix}-{group.name}-{i}')
+            students.append(Student.objects.create(
+                user=user,
+                lastname=f'Фамилия{i:03}',
+                name=f'{prefix}{i % 3}',
+                birth_date=date(2005, 1, 1),
+                phone='+79000000000',
+                group=group,
+            ))
+        return students
+
+
+class StudentsAPIPaginationTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.group = self.create_group()
+        self.url = reverse('students-api')
+
+    def count_page_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_query_count_does_not_depend_on_table_size(self):
+        self.create_students(self.group, 5)
+        small, _ = self.count_page_queries(limit=5)
+
+        self.create_students(self.create_group(name='ИС-22'), 40, prefix='Другой')
+        large, data = self.count_page_queries(limit=20)
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['results']), 20)
+
+    def test_cursor_walks_all_students_in_index_order(self):
+        students = self.create_students(self.group, 7)
+        expected = [s.id for s in sorted(students, key=lambda s: (s.name, s.lastname, s.id))]
+
+        seen = []
+        params = {'limit': 3}
+        while True:
+            data = self.client.get(self.url, params).json()
+            seen += [row['id'] for row in data['results']]
+            if not data['next']:
+                break
+            params = dict(parse_qsl(urlsplit(data['next']).query))
+
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'не-курсор'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_without_pagination_returns_plain_list(self):
+        self.create_students(self.group, 2)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 2)
+
+
+class StudentsBulkCreateAPITest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.group = self.create_group()
+        self.url = reverse('students-bulk-register-api')
+
+    def make_row(self, i, **overrides):
+        row = {
+            'username': f'bulk{i}',
+            'password': 'Secret123!',
+            'lastname': f'Иванов{i}',
+            'name': 'Иван',
+            'birth_date': '2006-05-01',
+            'phone': '+79000000000',
+            'group': self.group.id,
+        }
+        row.update(overrides)
+        return row
+
+    def test_json_rows_are_created(self):
+        response = self.client.post(self.url, [self.make_row(i) for i in range(3)], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 3)
+        user = User.objects.get(username='bulk0')
+        self.assertTrue(user.check_password('Secret123!'))
+        self.assertEqual(user.student_profile.group, self.group)
+
+    def test_errors_are_reported_per_row_and_nothing_is_created(self):
+        User.objects.create(username='bulk1')
+        rows = [
+            self.make_row(0),
+            self.make_row(1),
+            self.make_row(2, group=999999),
+            self.make_row(3, username='bulk0'),
+        ]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('username', errors[1])
+        self.assertIn('group', errors[2])
+        self.assertIn('username', errors[3])
+        self.assertFalse(Student.objects.exists())
+
+    def test_csv_body(self):
+        body = (
+            'username,password,lastname,name,birth_date,phone,group\n'
+            f'csv1,Secret123!,Петров,Петр,2006-01-01,+79000000000,{self.group.id}\n'
+        )
+        response = self.client.post(self.url, body.encode('utf-8'), content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Student.objects.filter(user__username='csv1').exists())
+
+
+class StudentCertificatesTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.group = self.create_group()
+        self.students = self.create_students(self.group, 3)
+        self.url = reverse('students-certificates')
+
+    def test_single_certificate(self):
+        response = self.client.get(reverse('student-certificate', args=[self.students[0].id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_group_pdf_uses_single_select_and_insert(self):
+        self.create_students(self.group, 5, prefix='Еще')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {'group': self.group.id})
+        self.assertEqual(response.status_code, 200)
+        # Студенты одним SELECT, номера справок одним INSERT в журнал
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(IssuedCertificate.objects.count(), 8)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_anonymous_cannot_issue_certificate(self):
+        response = APIClient().get(reverse('student-certificate', args=[self.students[0].id]))
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(IssuedCertificate.objects.exists())
+
+    def test_numbers_are_sequential(self):
+        self.client.get(reverse('student-certificate', args=[self.students[0].id]))
+        self.client.get(self.url, {'ids': ','.join(str(s.id) for s in self.students)})
+        issued = list(IssuedCertificate.objects.values_list('pk', 'student_id'))
+        numbers = [pk for pk, _ in issued]
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 4)))
+        self.assertEqual([student_id for _, student_id in issued][1:], sorted(s.id for s in self.students))
+
+    def test_static_text_drawn_once_per_document(self):
+        contexts = issue_certificates(certificate_students(Student.objects).filter(group=self.group))
+        pdf = render_certificates_pdf(contexts)
+        self.assertEqual(pdf.count(b'/Subtype /Form'), 1)
+        self.assertEqual(pdf.count(f'/FormXob.{certificate_template.name}'.encode()), len(contexts))
+        # Поля выводятся после неизменной части строки
+        fields = [text for *_, text in certificate_template.fields]
+        self.assertIn('{number} от {date}', fields)
+        self.assertIn('{full_name}', fields)
+
+    def test_zip_by_ids(self):
+        ids = ','.join(str(s.id) for s in self.students[:2])
+        response = self.client.get(self.url, {'ids': ids, 'output': 'zip'})
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 2)
+
+    def test_group_with_whitespace_gets_clean_filename(self):
+        response = self.client.get(self.url, {'group': f' {self.group.id}\n'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'spravki_group_{self.group.id}.pdf', response['Content-Disposition'])
+
+    def test_requires_group_or_ids(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username='jwt-user', password='Secret123!')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.client = APIClient()
+        self.client.cookies[settings.SIMPLE_JWT['AUTH_COOKIE']] = self.token
+
+    def test_cookie_token_hits_auth_user_once(self):
+        url = reverse('roles-api')
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        with CaptureQueriesContext(connection) as second:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        user_queries = [q for q in first.captured_queries if 'auth_user' in q['sql']]
+        self.assertEqual(len(user_queries), 1)
+        self.assertFalse([q for q in second.captured_queries if 'auth_user' in q['sql']])
+        self.assertEqual(user_cache.stats()['hits'], 1)
+        self.assertEqual(user_cache.stats()['misses'], 1)
+
+    def test_user_change_invalidates_cache(self):
+        self.client.get(reverse('roles-api'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('roles-api')).status_code, 401)
+
+    def test_invalid_token(self):
+        self.client.cookies[settings.SIMPLE_JWT['AUTH_COOKIE']] = 'broken'
+        self.assertEqual(self.client.get(reverse('roles-api')).status_code, 401)
+
+    def test_invalid_cookie_falls_back_to_bearer_header(self):
+        self.client.cookies[settings.SIMPLE_JWT['AUTH_COOKIE']] = 'broken'
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(self.client.get(reverse('roles-api')).status_code, 200)
+
+
+class AuditStampingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='auditor', password='Secret123!')
+
+    def test_save_outside_request_leaves_audit_empty(self):
+        role = Role.objects.create(name='Староста')
+        self.assertIsNone(role.created_by)
+        self.assertIsNone(role.updated_by)
+
+    def test_request_user_is_stamped(self):
+        client = APIClient()
+        client.cookies[settings.SIMPLE_JWT['AUTH_COOKIE']] = str(RefreshToken.for_user(self.user).access_token)
+        response = client.post(reverse('roles-create-api'), {'name': 'Староста'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        role = Role.objects.get(pk=response.json()['role_id'])
+        self.assertEqual(role.created_by, self.user)
+        self.assertEqual(role.updated_by, self.user)
+
+    def test_bulk_operations_are_stamped(self):
+        with audit_user(self.user):
+            Role.objects.bulk_create([Role(name='Студент'), Role(name='Староста')])
+            self.assertEqual(Role.objects.filter(created_by=self.user, updated_by=self.user).count(), 2)
+
+        other = User.objects.create(username='other')
+        with audit_user(other):
+            Role.objects.filter(name='Студент').update(name='Слушатель')
+            roles = list(Role.objects.all())
+            for role in roles:
+                role.name += '!'
+            Role.objects.bulk_update(roles, ['name'])
+        self.assertEqual(Role.objects.filter(updated_by=other).count(), 2)
+        self.assertEqual(Role.objects.filter(created_by=self.user).count(), 2)
+
+
+class SoftDeleteQuerySetTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin')
+        self.group = self.create_group()
+        self.students = self.create_students(self.group, 3)
+
+    def test_soft_delete_and_restore_are_single_updates(self):
+        with self.assertNumQueries(1):
+            count = Student.objects.filter(pk__in=[s.pk for s in self.students[:2]]).soft_delete(deleted_by=self.user)
+        self.assertEqual(count, 2)
+        self.assertEqual(Student.objects.count(), 1)
+        self.assertEqual(Student.all_objects.filter(deleted_by=self.user).count(), 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(Student.objects.restore(), 2)
+        self.assertEqual(Student.objects.count(), 3)
+
+    def test_group_cascade(self):
+        # Студент, удаленный раньше группы, не должен восстановиться вместе с ней
+        Student.objects.filter(pk=self.students[0].pk).soft_delete()
+
+        self.assertEqual(Group.objects.filter(pk=self.group.pk).soft_delete(cascade=True), 1)
+        self.assertFalse(Student.objects.exists())
+
+        self.assertEqual(Group.all_objects.filter(pk=self.group.pk).restore(cascade=True), 1)
+        self.assertEqual(
+            set(Student.objects.values_list('pk', flat=True)),
+            {s.pk for s in self.students[1:]},
+        )
+
+
+class SoftDeletePartialIndexTest(StudentsDataMixin, TestCase):
+    """Списки активных записей должны идти по частичным индексам (is_deleted = False)"""
+
+    def setUp(self):
+        self.group = self.create_group()
+        students = self.create_students(self.group, 20)
+        Student.objects.filter(pk__in=[s.pk for s in students[:10]]).soft_delete()
+        if connection.vendor == 'postgresql':
+            # На маленькой тестовой таблице планировщик и так выбрал бы seq scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(index_name, queryset.explain())
+
+    def test_active_listings_use_partial_indexes(self):
+        self.assertUsesIndex(Student.objects.order_by('name', 'lastname', 'id')[:50], 'student_active_name_idx')
+        self.assertUsesIndex(Student.objects.filter(group_id=self.group.pk).order_by('name', 'lastname'), 'student_active_group_idx')
+        self.assertUsesIndex(Teacher.objects.all(), 'teacher_active_fio_idx')
+        self.assertUsesIndex(Region.objects.values_list('name', flat=True), 'region_active_name_idx')
+
+    @skipUnless(connection.vendor == 'postgresql', 'Только для PostgreSQL')
+    def test_region_names_are_index_only_scan(self):
+        plan = Region.objects.values_list('name', flat=True).explain()
+        self.assertIn('Index Only Scan', plan)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Только для PostgreSQL')
+    def test_indexes_are_partial(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE indexname LIKE %s",
+                ['%_active_%'],
+            )
+            indexes = dict(cursor.fetchall())
+        self.assertIn('student_active_name_idx', indexes)
+        for definition in indexes.values():
+            self.assertIn('WHERE (NOT is_deleted)', definition)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Только для PostgreSQL')
+    def test_partial_index_is_smaller_than_full(self):
+        # 9 из 10 регионов удалены: частичный индекс хранит только активные строки
+        Region.objects.bulk_create(
+            Region(name=f'Регион {i:05}', is_deleted=i % 10 != 0) for i in range(5000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef, pg_relation_size(format('%%I', indexname)::regclass) "
+                "FROM pg_indexes WHERE tablename = %s",
+                [Region._meta.db_table],
+            )
+            rows = cursor.fetchall()
+        sizes = {name: size for name, _, size in rows}
+        full = [size for _, definition, size in rows if definition.endswith('(name)')]
+        self.assertTrue(full)
+        self.assertLess(sizes['region_active_name_idx'] * 3, min(full))
+
+
+class StudentCourseAnnotationTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.year = current_academic_year()
+        self.first = self.create_students(self.create_group('П-1', self.year), 2, prefix='Первый')
+        self.third = self.create_students(self.create_group('П-3', self.year - 2), 3, prefix='Третий')
+        self.future = self.create_students(self.create_group('П-0', self.year + 1), 1, prefix='Будущий')
+
+    def test_annotation_matches_python_course(self):
+        annotated = {s.pk: s.course for s in Student.objects.with_course()}
+        for student in Student.objects.select_related('group'):
+            self.assertEqual(annotated[student.pk], student.course)
+        self.assertEqual(annotated[self.third[0].pk], 'III')
+        self.assertIsNone(annotated[self.future[0].pk])
+
+    def test_filter_by_course(self):
+        self.assertEqual(Student.objects.with_course().filter(course_number=3).count(), 3)
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username='admin'))
+        data = client.get(reverse('students-api'), {'course': 'III'}).json()
+        self.assertEqual({row['id'] for row in data}, {s.pk for s in self.third})
+        self.assertEqual({row['course_display'] for row in data}, {'III курс'})
+        self.assertEqual(client.get(reverse('students-api'), {'course': 'x'}).status_code, 400)
+
+
+class ValuesSerializersTest(StudentsDataMixin, TestCase):
+    """Быстрые сериализаторы списков должны давать тот же JSON, что и ModelSerializer"""
+
+    def assertSameJSON(self, queryset, model_serializer, values_serializer):
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(values_serializer(queryset).data),
+            renderer.render(model_serializer(queryset, many=True).data),
+        )
+
+    def test_students(self):
+        region = Region.objects.create(name='Татарстан')
+        students = self.create_students(self.create_group(), 3)
+        students[0].middlename = 'Иванович'
+        students[0].photo = 'students/photos/photo1.jpeg'
+        students[0].city = City.objects.create(name='Альметьевск', region=region)
+        students[0].save()
+        self.create_students(self.create_group('Б-1', current_academic_year() + 1), 1, prefix='Будущий')
+
+        self.assertSameJSON(Student.objects.with_course(), StudentSerializer, StudentValuesSerializer)
+
+    def test_teachers(self):
+        Teacher.objects.create(
+            user=User.objects.create(username='teacher'), lastname='Петров', name='Петр',
+            middlename='Петрович', birth_date=date(1980, 1, 1), phone='+79000000001',
+            photo='teachers/photos/photo2.jpeg',
+        )
+        Teacher.objects.create(
+            user=User.objects.create(username='teacher2'), lastname='Сидоров', name='Сидор',
+            birth_date=date(1985, 1, 1), phone='+79000000002',
+        )
+        self.assertSameJSON(Teacher.objects.all(), TeacherSerializer, TeacherValuesSerializer)
+
+    def test_cities_and_roles(self):
+        region = Region.objects.create(name='Татарстан')
+        City.objects.create(name='Альметьевск', region=region)
+        City.objects.create(name='Казань', region=region)
+        Role.objects.create(name='Староста')
+        self.assertSameJSON(City.objects.all(), CitySerializer, CityValuesSerializer)
+        self.assertSameJSON(Role.objects.all(), RoleSerializer, RoleValuesSerializer)
+
+
+class ExportAPITest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.students = self.create_students(self.create_group(), 4)
+
+    def test_students_ndjson_matches_list_rows(self):
+        response = self.client.get(reverse('students-export-api'))
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        exported = [json.loads(line) for line in lines]
+        listed = self.client.get(reverse('students-api')).json()
+        self.assertEqual(sorted(exported, key=lambda r: r['id']), sorted(listed, key=lambda r: r['id']))
+
+    def test_students_csv(self):
+        response = self.client.get(reverse('students-export-api'), {'output': 'csv'})
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['user.username'], self.students[0].user.username)
+        self.assertEqual(rows[0]['middlename'], '')
+
+    def test_teachers_empty_and_bad_output(self):
+        response = self.client.get(reverse('teachers-export-api'))
+        self.assertEqual(b''.join(response.streaming_content), b'')
+        self.assertEqual(self.client.get(reverse('teachers-export-api'), {'output': 'xml'}).status_code, 400)
+
+
+class ReferenceDataCacheTest(TestCase):
+    def setUp(self):
+        reference_data.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.region = Region.objects.create(name='Татарстан')
+        City.objects.create(name='Альметьевск', region=self.region)
+        Role.objects.create(name='Староста')
+
+    def test_dictionaries_without_queries_in_steady_state(self):
+        for name in ('regions-api', 'cities-api', 'roles-api'):
+            self.client.get(reverse(name))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('regions-api')).json(), [{'name': 'Татарстан'}])
+            cities = self.client.get(reverse('cities-api')).json()
+            self.assertEqual(cities[0]['region_name'], 'Татарстан')
+            self.assertEqual(len(self.client.get(reverse('roles-api')).json()), 1)
+
+    def test_snapshot_expires_without_version_change(self):
+        self.client.get(reverse('regions-api'))
+        # Изменение мимо сигналов (как на другом хосте с собственным общим кэшем)
+        with connection.cursor() as cursor:
+            cursor.execute(f'UPDATE {Region._meta.db_table} SET name = %s WHERE id = %s', ['Башкортостан', self.region.pk])
+        self.assertEqual(self.client.get(reverse('regions-api')).json(), [{'name': 'Татарстан'}])
+        with mock.patch('app.reference_data.time.monotonic', return_value=time.monotonic() + SNAPSHOT_TTL + 1):
+            self.assertEqual(self.client.get(reverse('regions-api')).json(), [{'name': 'Башкортостан'}])
+
+    def test_city_keeps_name_of_soft_deleted_region(self):
+        Region.objects.filter(pk=self.region.pk).soft_delete()
+        self.assertEqual(self.client.get(reverse('regions-api')).json(), [])
+        self.assertEqual(self.client.get(reverse('cities-api')).json()[0]['region_name'], 'Татарстан')
+        self.assertEqual(str(City.objects.get()), 'Альметьевск (Татарстан)')
+
+    def test_changes_invalidate_snapshot(self):
+        self.assertEqual(len(self.client.get(reverse('roles-api')).json()), 1)
+
+        Role.objects.create(name='Студент')
+        self.assertEqual(len(self.client.get(reverse('roles-api')).json()), 2)
+
+        # Массовое мягкое удаление не шлет post_save, но тоже сбрасывает кэш
+        Role.objects.filter(name='Студент').soft_delete()
+        self.assertEqual(len(self.client.get(reverse('roles-api')).json()), 1)
+
+        self.region.name = 'Республика Татарстан'
+        self.region.save()
+        self.assertEqual(self.client.get(reverse('cities-api')).json()[0]['region_name'], 'Республика Татарстан')
+
+
+class ConditionalListTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        reference_data.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.students = self.create_students(self.create_group(), 3)
+
+    def test_unchanged_students_return_304_with_one_query(self):
+        url = reverse('students-api')
+        first = self.client.get(url)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+
+        with self.assertNumQueries(1):
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+        # Другие параметры - другой ответ, значит и другой ETag
+        self.assertNotEqual(self.client.get(url, {'course': 'I'})['ETag'], first['ETag'])
+
+    def test_changes_and_soft_delete_change_etag(self):
+        url = reverse('students-api')
+        etag = self.client.get(url)['ETag']
+
+        Student.objects.filter(pk=self.students[0].pk).soft_delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+        etag = response['ETag']
+        group = self.students[1].group
+        group.name = 'ИС-99'
+        group.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_username_change_changes_etag(self):
+        url = reverse('students-api')
+        etag = self.client.get(url)['ETag']
+        user = self.students[0].user
+        user.username = 'renamed'
+        user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('renamed', [row['user']['username'] for row in response.json()])
+
+        # Вход пользователя логин не меняет
+        etag = response['ETag']
+        user.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_dictionaries_use_snapshot_state(self):
+        Role.objects.create(name='Староста')
+        url = reverse('roles-api')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Role.objects.create(name='Студент')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class PhotoProcessingTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, PHOTO_WORKERS=0)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def make_photo(self, size=(1600, 1200)):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, 'PNG')
+        return SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+
+    def test_upload_is_saved_as_is_and_queued(self):
+        student = self.create_students(self.create_group(), 1)[0]
+        student.photo = self.make_photo()
+        student.save()
+
+        student.refresh_from_db()
+        self.assertEqual(student.photo_status, 'pending')
+        self.assertTrue(student.photo.name.endswith('.png'))
+        self.assertTrue(PhotoJob.objects.filter(object_id=student.pk, status=PhotoJob.STATUS_PENDING).exists())
+
+    def test_worker_compresses_photo_and_removes_original(self):
+        student = self.create_students(self.create_group(), 1)[0]
+        student.photo = self.make_photo()
+        student.save()
+        original = student.photo.name
+
+        self.assertEqual(process_pending(), 1)
+
+        student.refresh_from_db()
+        self.assertEqual(student.photo_status, 'ready')
+        self.assertTrue(student.photo.name.endswith('.jpg'))
+        self.assertFalse(student.photo.storage.exists(original))
+        with Image.open(student.photo.path) as image:
+            self.assertLessEqual(max(image.size), 800)
+        self.assertEqual(PhotoJob.objects.get().status, PhotoJob.STATUS_DONE)
+
+    def test_save_without_new_photo_does_not_queue(self):
+        student = self.create_students(self.create_group(), 1)[0]
+        student.phone = '+79000000001'
+        student.save()
+        self.assertFalse(PhotoJob.objects.exists())
+
+
+class PhotoRenditionTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, PHOTO_WORKERS=0)
+        self.settings_override.enable()
+        self.student = self.create_students(self.create_group(), 1)[0]
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 900), 'blue').save(buffer, 'PNG')
+        self.student.photo = SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+        self.student.save()
+        process_pending()
+        self.student.refresh_from_db()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def get_rendition(self, name, accept='*/*'):
+        url = StudentSerializer(self.student).data['photo_renditions'][name]
+        return self.client.get(url, HTTP_ACCEPT=accept)
+
+    def test_serializers_expose_rendition_urls(self):
+        urls = StudentSerializer(self.student).data['photo_renditions']
+        self.assertEqual(set(urls), {'thumb', 'small', 'medium'})
+        values = StudentValuesSerializer(Student.objects.with_course()).data[0]
+        self.assertEqual(values['photo_renditions'], urls)
+
+    def test_rendition_size_and_format(self):
+        response = self.get_rendition('small')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as image:
+            self.assertEqual(max(image.size), 160)
+
+        response = self.get_rendition('thumb', accept='image/webp,*/*')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('Accept', response['Vary'])
+
+    def test_renditions_prebuilt_and_invalidated_on_photo_change(self):
+        old_url = StudentSerializer(self.student).data['photo_renditions']['medium']
+        renditions_dir = os.path.join(self.media_root, 'renditions', 'student', str(self.student.pk))
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(renditions_dir)), 6)
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (300, 300), 'green').save(buffer, 'PNG')
+        self.student.photo = SimpleUploadedFile('new.png', buffer.getvalue(), content_type='image/png')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.save()
+
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(renditions_dir)), 0)
+        self.assertNotEqual(StudentSerializer(self.student).data['photo_renditions']['medium'], old_url)
+
+    def test_same_file_name_with_new_content_gets_new_version(self):
+        old_url = StudentSerializer(self.student).data['photo_renditions']['medium']
+        self.student.photo = None
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.save()
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 900), 'yellow').save(buffer, 'PNG')
+        self.student.photo = SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+        self.student.save()
+        process_pending()
+        self.student.refresh_from_db()
+        self.assertNotEqual(StudentSerializer(self.student).data['photo_renditions']['medium'], old_url)
+
+    def test_list_urls_reverse_once_per_model(self):
+        with mock.patch('app.renditions.reverse', wraps=reverse) as reverse_mock:
+            rendition_url_templates.cache_clear()
+            StudentValuesSerializer(Student.objects.with_course()).data
+            StudentValuesSerializer(Student.objects.with_course()).data
+        self.assertEqual(reverse_mock.call_count, len(RENDITIONS))
+
+
+class PhotoChangeTrackingTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, PHOTO_WORKERS=0)
+        self.settings_override.enable()
+        student = self.create_students(self.create_group(), 1)[0]
+        student.photo = SimpleUploadedFile('photo.png', b'not-processed', content_type='image/png')
+        student.save()
+        self.old_photo = student.photo.name
+        self.student = Student.objects.get(pk=student.pk)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_save_without_photo_change_has_no_extra_select(self):
+        self.student.phone = '+79000000001'
+        with CaptureQueriesContext(connection) as ctx:
+            self.student.save()
+        self.assertEqual([q['sql'].split()[0] for q in ctx.captured_queries], ['UPDATE'])
+
+    def test_update_fields_without_photo_skips_photo_check(self):
+        self.student.photo = None
+        with CaptureQueriesContext(connection) as ctx:
+            self.student.save(update_fields=['phone'])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(Student.objects.get(pk=self.student.pk).photo.name, self.old_photo)
+
+    def test_old_photo_removed_only_after_commit(self):
+        storage = self.student.photo.storage
+        self.student.photo = SimpleUploadedFile('new.png', b'new', content_type='image/png')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.student.save()
+            self.assertTrue(storage.exists(self.old_photo))
+        for callback in callbacks:
+            callback()
+        self.assertFalse(storage.exists(self.old_photo))
+
+    def test_soft_delete_keeps_photo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+        self.assertTrue(self.student.photo.storage.exists(self.old_photo))
+
+
+class CollectOrphanedMediaTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, PHOTO_WORKERS=0)
+        self.settings_override.enable()
+        student = self.create_students(self.create_group(), 1)[0]
+        student.photo = SimpleUploadedFile('photo.png', b'photo', content_type='image/png')
+        student.save()
+        self.kept = os.path.join(self.media_root, student.photo.name)
+        self.orphans = [
+            self.make_file('students/photos/lost.jpg'),
+            self.make_file('teachers/photos/lost.jpg'),
+            self.make_file(f'renditions/student/{student.pk}/oldversion/thumb.jpg'),
+        ]
+        for path in [self.kept] + self.orphans:
+            os.utime(path, (0, 0))
+        self.young = self.make_file('students/photos/uploading.jpg')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def make_file(self, relative):
+        path = os.path.join(self.media_root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x')
+        return path
+
+    def test_dry_run_only_reports(self):
+        out = io.StringIO()
+        call_command('collect_orphaned_media', '--dry-run', stdout=out)
+        self.assertIn('Осиротевших: 3', out.getvalue())
+        self.assertTrue(all(os.path.exists(path) for path in self.orphans))
+
+    def test_deletes_only_old_unreferenced_files(self):
+        call_command('collect_orphaned_media', '--batch-size', '2', stdout=io.StringIO())
+        self.assertFalse(any(os.path.exists(path) for path in self.orphans))
+        self.assertTrue(os.path.exists(self.kept))
+        self.assertTrue(os.path.exists(self.young))
+
+
+class StudentsFilteringTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.url = reverse('students-api')
+        year = current_academic_year()
+        self.first_group = self.create_group('П-1', year)
+        self.third_group = self.create_group('П-3', year - 2)
+        self.first = self.create_students(self.first_group, 3, prefix='Первый')
+        self.third = self.create_students(self.third_group, 2, prefix='Третий')
+        self.role = Role.objects.create(name='Староста')
+        Student.objects.filter(pk=self.third[0].pk).update(role=self.role)
+
+    def get_ids(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['id'] for row in response.json()]
+
+    def test_filters(self):
+        third_ids = {s.pk for s in self.third}
+        self.assertEqual(set(self.get_ids(group=self.third_group.pk)), third_ids)
+        self.assertEqual(set(self.get_ids(group=f'{self.first_group.pk},{self.third_group.pk}')),
+                         {s.pk for s in self.first + self.third})
+        self.assertEqual(set(self.get_ids(course='III')), third_ids)
+        self.assertEqual(self.get_ids(role=self.role.pk), [self.third[0].pk])
+        self.assertEqual(len(self.get_ids(speciality=self.first_group.speciality_id)), 5)
+
+        Group.objects.filter(pk=self.first_group.pk).update(is_active=False)
+        self.assertEqual(set(self.get_ids(is_active='true')), third_ids)
+
+    def test_name_prefix_search(self):
+        self.assertEqual(set(self.get_ids(search='третий')), {s.pk for s in self.third})
+        self.assertEqual(self.get_ids(search='Фамилия001 Первый'), [self.first[1].pk])
+
+    def test_ordering_whitelist(self):
+        ids = self.get_ids(ordering='-lastname')
+        expected = sorted(self.first + self.third, key=lambda s: (s.lastname, s.name, s.pk), reverse=True)
+        self.assertEqual(ids, [s.pk for s in expected])
+        self.assertEqual(self.client.get(self.url, {'ordering': 'birth_date'}).status_code, 400)
+
+    def test_descending_cursor_pagination(self):
+        seen = []
+        params = {'ordering': '-name', 'limit': 2}
+        while True:
+            data = self.client.get(self.url, params).json()
+            seen += [row['id'] for row in data['results']]
+            if not data['next']:
+                break
+            params = dict(parse_qsl(urlsplit(data['next']).query))
+        self.assertEqual(seen, self.get_ids(ordering='-name'))
+
+    def test_invalid_params(self):
+        response = self.client.get(self.url, {'group': 'abc', 'is_active': 'maybe'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'group', 'is_active'})
+
+    @skipUnless(connection.vendor == 'postgresql', 'Только для PostgreSQL')
+    def test_query_plans_avoid_seq_scan_on_students(self):
+        # 100 000 студентов в 400 группах, статистика обновляется через ANALYZE
+        year = current_academic_year()
+        speciality, qualification = self.first_group.speciality, self.first_group.qualification
+        groups = Group.objects.bulk_create(
+            Group(name=f'G-{i}', speciality=speciality, qualification=qualification,
+                  start_year=year - i % 4, is_active=i % 10 != 0)
+            for i in range(400)
+        )
+        users = User.objects.bulk_create(User(username=f'plan-{i}') for i in range(100000))
+        Student.objects.bulk_create(
+            (Student(user=user, lastname=f'Фамилия{i:06}', name=f'Имя{i % 500}', birth_date=date(2005, 1, 1),
+                     phone='+79000000000', group=groups[i % 400], role=self.role if i % 1000 == 0 else None)
+             for i, user in enumerate(users)),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        cases = [
+            {'group': str(groups[7].pk)},
+            {'speciality': str(speciality.pk)},
+            {'course': 'II'},
+            {'role': str(self.role.pk)},
+            {'is_active': 'true'},
+            {'search': 'Фамилия0012'},
+            {'search': 'Фамилия0012 Имя1'},
+            {'group': str(groups[7].pk), 'search': 'Имя'},
+        ]
+        for params in cases:
+            for ordering in STUDENT_ORDERINGS.values():
+                queryset, errors = filter_students(Student.objects.with_course(), params)
+                self.assertFalse(errors)
+                plan = queryset.order_by(*ordering)[:51].explain()
+                with self.subTest(params=params, ordering=ordering):
+                    self.assertNotIn('Seq Scan on app_student', plan)
+
+
+class PeopleSearchTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.url = reverse('search-api')
+        group = self.create_group()
+        user = User.objects.create(username='ivanov')
+        self.student = Student.objects.create(
+            user=user, lastname='Иванов', name='Пётр', middlename='Сергеевич',
+            birth_date=date(2005, 1, 1), phone='+79000000000', group=group,
+        )
+        self.teacher = Teacher.objects.create(
+            user=User.objects.create(username='t-ivanova'), lastname='Иванова', name='Анна',
+            birth_date=date(1980, 1, 1), phone='+79000000000',
+        )
+        self.create_students(group, 3)
+
+    def test_search_endpoint(self):
+        data = self.client.get(self.url, {'q': 'Иванов'}).json()['results']
+        self.assertEqual({(row['type'], row['id']) for row in data},
+                         {('student', self.student.pk), ('teacher', self.teacher.pk)})
+        student = next(row for row in data if row['type'] == 'student')
+        self.assertEqual(student['full_name'], 'Иванов Пётр Сергеевич')
+        self.assertEqual(student['group_name'], 'ИС-21')
+
+        data = self.client.get(self.url, {'q': 'Иванов Пётр', 'type': 'student'}).json()['results']
+        self.assertEqual([row['id'] for row in data], [self.student.pk])
+
+    def test_search_validation(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'и'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'Иванов', 'type': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'Иванов', 'limit': '0'}).status_code, 400)
+
+    def test_admin_search_uses_search_module(self):
+        from django.contrib.admin.sites import site
+        admin_user = User.objects.create_superuser('root', password='x')
+        request = type('Request', (), {'user': admin_user})()
+        model_admin = site._registry[Student]
+        found, may_have_duplicates = model_admin.get_search_results(
+            request, model_admin.get_queryset(request), 'Иванов')
+        self.assertEqual(list(found), [self.student])
+        found, _ = model_admin.get_search_results(request, model_admin.get_queryset(request), 'ivanov')
+        self.assertEqual(list(found), [self.student])
+
+    @skipUnless(connection.vendor == 'postgresql', 'Только для PostgreSQL')
+    def test_typo_tolerant_and_ranked(self):
+        data = search_people('ивнов пётр')
+        self.assertEqual((data[0]['type'], data[0]['id']), ('student', self.student.pk))
+        ranks = [row['rank'] for row in data]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+
+class GroupStatisticsTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        invalidate_group_statistics()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.url = reverse('group-statistics-api')
+        year = current_academic_year()
+        self.first = self.create_group('П-1', year)
+        self.third = self.create_group('П-3', year - 2)
+        Group.objects.filter(pk=self.third.pk).update(max_students=2)
+        self.students = self.create_students(self.first, 3)
+        self.create_students(self.third, 2, prefix='Третий')
+        Group.objects.create(name='Старая', speciality=self.first.speciality,
+                             qualification=self.first.qualification, start_year=year - 5, is_active=False)
+
+    def tearDown(self):
+        invalidate_group_statistics()
+
+    def get_stats(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_and_occupancy(self):
+        data = self.get_stats()
+        groups = {row['name']: row for row in data['groups']}
+        self.assertEqual(set(groups), {'П-1', 'П-3'})
+        self.assertEqual(groups['П-1'], {
+            'id': self.first.pk, 'name': 'П-1', 'speciality_id': self.first.speciality_id,
+            'speciality': 'Информационные системы', 'course': 'I',
+            'students': 3, 'capacity': 25, 'free_places': 22, 'occupancy': 0.12,
+        })
+        self.assertEqual(groups['П-3']['free_places'], 0)
+        self.assertEqual(groups['П-3']['occupancy'], 1.0)
+        self.assertEqual([row['course'] for row in data['courses']], ['I', 'III'])
+        self.assertEqual(data['specialities'][0]['students'], 5)
+        self.assertEqual(data['total']['capacity'], 27)
+
+    def test_single_query_and_cache(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.get_stats()
+        self.assertEqual(len(ctx.captured_queries), 1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.get_stats()
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_invalidated_on_create_transfer_and_delete(self):
+        self.assertEqual(self.get_stats()['total']['students'], 5)
+
+        self.create_students(self.first, 1, prefix='Новый')
+        self.assertEqual(self.get_stats()['total']['students'], 6)
+
+        student = Student.objects.get(pk=self.students[0].pk)
+        student.group = self.third
+        student.save()
+        groups = {row['name']: row['students'] for row in self.get_stats()['groups']}
+        self.assertEqual(groups, {'П-1': 3, 'П-3': 3})
+
+        Student.objects.filter(pk=student.pk).soft_delete()
+        self.assertEqual(self.get_stats()['total']['students'], 5)
+
+    def test_unrelated_update_keeps_cache(self):
+        self.get_stats()
+        Student.objects.filter(pk=self.students[0].pk).update(phone='+79000000001')
+        with CaptureQueriesContext(connection) as ctx:
+            self.get_stats()
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+
+@override_settings(REQUEST_METRICS=True, METRICS_TOKEN='secret')
+class RequestMetricsTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        metrics_registry.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.create_students(self.create_group(), 3)
+
+    def tearDown(self):
+        metrics_registry.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('students-api'))
+        timing = response['Server-Timing']
+        # Состояние коллекции для ETag и сам список
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="2 queries"')
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    async def test_server_timing_under_asgi(self):
+        # Запросы async ORM идут в потоке sync_to_async, они тоже должны учитываться
+        token = str(RefreshToken.for_user(await User.objects.aget(username='admin')).access_token)
+        response = await self.async_client.get(
+            reverse('students-async-api'), {'limit': 2}, headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+    def test_prometheus_endpoint(self):
+        self.client.get(reverse('students-api'))
+        self.client.get(reverse('students-api'), {'limit': 'x'})
+
+        response = self.client.get(reverse('metrics-api'), HTTP_X_METRICS_TOKEN='secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="students-api"} 2', text)
+        self.assertIn('http_request_queries_bucket{view="students-api",le="2"} 2', text)
+        self.assertIn('http_responses_total{view="students-api",status="400"} 1', text)
+        self.assertIn('http_request_duration_quantile_seconds{view="students-api",quantile="0.99"}', text)
+
+        wrong = APIClient().get(reverse('metrics-api'), HTTP_X_METRICS_TOKEN='wrong')
+        self.assertIn(wrong.status_code, (401, 403))
+
+        anonymous = APIClient()
+        self.assertEqual(anonymous.get(reverse('metrics-api')).status_code, 401)
+
+    def test_collect_metrics_context_manager(self):
+        with collect_metrics() as metrics:
+            list(Student.objects.all())
+            list(Group.objects.all())
+        self.assertEqual(metrics.queries, 2)
+        self.assertIsNotNone(metrics.duration)
+
+    def test_histogram_quantiles_are_bounded(self):
+        histogram = Histogram((0.1, 0.2, 0.5))
+        for value in [0.05] * 50 + [0.15] * 40 + [0.4] * 9 + [3.0]:
+            histogram.observe(value)
+        self.assertEqual(len(histogram.counts), 4)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.1)
+        self.assertTrue(0.1 < histogram.quantile(0.9) <= 0.2)
+        self.assertEqual(histogram.quantile(1.0), 0.5)
+
+
+class DatasetBenchmarkTest(TestCase):
+    def snapshot(self):
+        return list(Student.objects.order_by('user__username').values_list(
+            'user__username', 'lastname', 'name', 'middlename', 'birth_date', 'group__name',
+        ))
+
+    def test_generator_is_deterministic(self):
+        counts = generate_dataset(students=60, teachers=5, seed=7, group_size=25)
+        self.assertEqual(counts['groups'], 3)
+        first = self.snapshot()
+        clear_dataset()
+        self.assertFalse(dataset_exists())
+        generate_dataset(students=60, teachers=5, seed=7, group_size=25)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_bench_writes_results_and_detects_regressions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'bench.json')
+            call_command('bench_api', '--sizes', '30', '--repeat', '1', '--output', output, stdout=io.StringIO())
+            with open(output, encoding='utf-8') as f:
+                results = json.load(f)
+            self.assertFalse(dataset_exists())
+            self.assertEqual(set(results['30']['certificate']), {'latency_ms', 'queries', 'peak_memory_kb'})
+
+            # Базовая линия с меньшим числом запросов - это ухудшение
+            results['30']['students_page']['queries'] -= 1
+            baseline = os.path.join(tmp, 'baseline.json')
+            with open(baseline, 'w', encoding='utf-8') as f:
+                json.dump(results, f)
+            with self.assertRaisesMessage(CommandError, '30/students_page: SQL-запросов'):
+                call_command('bench_api', '--sizes', '30', '--repeat', '1', '--threshold', '100',
+                             '--baseline', baseline, stdout=io.StringIO())
+
+
+class AsyncViewsTest(StudentsDataMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.group = self.create_group()
+        self.students = self.create_students(self.group, 5)
+
+    def test_students_list_matches_sync_view(self):
+        for params in ({}, {'ordering': '-lastname', 'group': self.group.pk}):
+            sync = self.client.get(reverse('students-api'), params)
+            response = self.client.get(reverse('students-async-api'), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, sync.content)
+
+        page = self.client.get(reverse('students-async-api'), {'limit': 2}).json()
+        self.assertEqual(len(page['results']), 2)
+        self.assertIn('cursor=', page['next'])
+        self.assertEqual(self.client.get(reverse('students-async-api'), {'ordering': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('students-async-api'), {'limit': 'x'}).status_code, 400)
+
+    async def test_asgi_handler_lists_and_not_modified(self):
+        headers = {'Authorization': f'Bearer {self.token}'}
+        response = await self.async_client.get(reverse('teachers-async-api'), headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.get(reverse('students-async-api'), headers=headers)
+        self.assertEqual(len(response.json()), 5)
+        repeated = await self.async_client.get(
+            reverse('students-async-api'), headers={**headers, 'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(repeated.status_code, 304)
+
+        anonymous = await self.async_client.get(reverse('students-async-api'))
+        self.assertEqual(anonymous.status_code, 401)
+
+    async def test_certificate_rendered_in_executor(self):
+        headers = {'Authorization': f'Bearer {self.token}'}
+        url = reverse('student-certificate-async', args=[self.students[0].pk])
+        response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.getvalue().startswith(b'%PDF'))
+
+        missing = await self.async_client.get(reverse('student-certificate-async', args=[0]), headers=headers)
+        self.assertEqual(missing.status_code, 404)
+
+        anonymous = await self.async_client.get(url)
+        self.assertEqual(anonymous.status_code, 401)
+        self.assertEqual(await IssuedCertificate.objects.acount(), 1)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class PasswordHashingTest(SimpleTestCase):
+    def test_large_batch_uses_shared_pool(self):
+        passwords = [f'Secret{i}!' for i in range(POOL_THRESHOLD)]
+        hashes = hash_passwords(passwords)
+        self.assertTrue(all(check_password(p, h) for p, h in zip(passwords, hashes)))
+        executor = get_password_executor()
+        hash_passwords(passwords)
+        self.assertIs(get_password_executor(), executor)
+        self.assertLessEqual(executor._max_workers, settings.PASSWORD_HASH_WORKERS)
+
+
+class WaitForDbTest(TestCase):
+    def test_reports_connection_settings(self):
+        out = io.StringIO()
+        call_command('wait_for_db', '--timeout', '1', stdout=out)
+        self.assertIn('доступна', out.getvalue())
+        self.assertIn('SELECT 1', out.getvalue())
+
+
+@override_settings(REPLICA_DATABASES=['replica1'], READ_YOUR_WRITES_SECONDS=5)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_from_replica_only_when_allowed(self):
+        self.assertEqual(self.router.db_for_read(Student), 'default')
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(Student), 'replica1')
+            # После записи в этом же запросе читаем свои изменения с основной базы
+            self.assertEqual(self.router.db_for_write(Student), 'default')
+            self.assertEqual(self.router.db_for_read(Student), 'default')
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(Student), 'replica1')
+
+    @override_settings(REPLICA_DATABASES=['replica1', 'replica2'])
+    def test_one_replica_per_block(self):
+        for _ in range(10):
+            with read_from_replica():
+                chosen = {self.router.db_for_read(Student) for _ in range(20)}
+            self.assertEqual(len(chosen), 1)
+            self.assertIn(chosen.pop(), ('replica1', 'replica2'))
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'app'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'app'))
+
+    def test_middleware_pins_writer_to_primary(self):
+        routed = []
+
+        def get_response(request):
+            routed.append(self.router.db_for_read(Student))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        factory = RequestFactory()
+
+        middleware(factory.get('/api/students/'))
+        response = middleware(factory.post('/api/regions/create/'))
+        cookie = response.cookies[ReplicaRoutingMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], 5)
+
+        pinned = factory.get('/api/students/')
+        pinned.COOKIES[ReplicaRoutingMiddleware.cookie_name] = '1'
+        self.assertNotIn(ReplicaRoutingMiddleware.cookie_name, middleware(pinned).cookies)
+        self.assertEqual(routed, ['replica1', 'default', 'default'])
+
+
+@skipUnless(settings.REPLICA_DATABASES, 'Нужна реплика: DB_REPLICA_HOSTS (в тестах - зеркало default)')
+class ReplicaRoutingIntegrationTest(StudentsDataMixin, TransactionTestCase):
+    # Зеркало - отдельное подключение: в TestCase оно не видит данных из незавершенной транзакции
+    databases = {'default', *settings.REPLICA_DATABASES}
+
+    def setUp(self):
+        self.replica = settings.REPLICA_DATABASES[0]
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin'))
+        self.create_students(self.create_group(), 3)
+
+    def captured(self, method, url, data=None):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[self.replica]) as replica:
+            response = getattr(self.client, method)(url, data)
+        return response, len(primary.captured_queries), len(replica.captured_queries)
+
+    def test_get_reads_replica_until_client_writes(self):
+        response, primary, replica = self.captured('get', reverse('students-api'))
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        response, primary, _ = self.captured('post', reverse('region-register-api'), {'name': 'Новый регион'})
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(primary, 0)
+
+        _, primary, replica = self.captured('get', reverse('students-api'))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_process_caches_rebuilt_from_primary(self):
+        reference_data.clear()
+        invalidate_group_statistics()
+        for url_name in ('regions-api', 'group-statistics-api'):
+            response, primary, replica = self.captured('get', reverse(url_name))
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(primary, 0)
+            self.assertEqual(replica, 0)
@@ -2,11 +2,13 @@ from django.urls import path
 from . import views
 from .Views import (
     UsersAPI,
-    StudentsAPI, StudentsCreateAPI,
-    TeachersAPI, TeachersCreateAPI,
+    StudentsAPI, StudentsCreateAPI, StudentsBulkCreateAPI, StudentsExportAPI,
+    TeachersAPI, TeachersCreateAPI, TeachersExportAPI,
     RolesAPI, RolesCreateAPI,
     CitiesAPI, CitiesCreateAPI,
-    RegionsAPI, RegionsCreateAPI
+    RegionsAPI, RegionsCreateAPI,
+    PhotoRenditionAPI, SearchAPI, GroupStatisticsAPI,
+    AsyncStudentsAPI, AsyncTeachersAPI,
 )
 
 urlpatterns = [
@@ -16,11 +18,15 @@ urlpatterns = [
     # Студенты
     path('students/', StudentsAPI.as_view(), name='students-api'),
     path('students/register/', StudentsCreateAPI.as_view(), name='register-api'),
+    path('students/register/bulk/', StudentsBulkCreateAPI.as_view(), name='students-bulk-register-api'),
+    path('students/export/', StudentsExportAPI.as_view(), name='students-export-api'),
     path('students/<int:pk>/certificate/', views.StudentCertificateAPI.as_view(), name='student-certificate'),
+    path('students/certificates/', views.StudentCertificatesBatchAPI.as_view(), name='students-certificates'),
 
     # Преподаватели
     path('teachers/', TeachersAPI.as_view(), name='teachers-api'),
     path('teachers/register/', TeachersCreateAPI.as_view(), name='teacher-register-api'),
+    path('teachers/export/', TeachersExportAPI.as_view(), name='teachers-export-api'),
 
     # Регионы
     path('regions/', RegionsAPI.as_view(), name='regions-api'),
@@ -34,7 +40,26 @@ urlpatterns = [
     path('roles/', RolesAPI.as_view(), name='roles-api'),
     path('roles/create/', RolesCreateAPI.as_view(), name='roles-create-api'),
 
+    # Async-варианты для ASGI
+    path('async/students/', AsyncStudentsAPI.as_view(), name='students-async-api'),
+    path('async/teachers/', AsyncTeachersAPI.as_view(), name='teachers-async-api'),
+    path('async/students/<int:pk>/certificate/', views.AsyncStudentCertificateAPI.as_view(),
+         name='student-certificate-async'),
+
+    # Статистика
+    path('statistics/groups/', GroupStatisticsAPI.as_view(), name='group-statistics-api'),
+
+    # Поиск по ФИО
+    path('search/', SearchAPI.as_view(), name='search-api'),
+
+    # Превью фотографий
+    path('photos/<str:model>/<int:pk>/<str:rendition>/', PhotoRenditionAPI.as_view(), name='photo-rendition'),
+
     # Авторизация
     path('auth/login/', views.LoginAPI.as_view(), name='login'),
     path('auth/logout/', views.LogoutAPI.as_view(), name='logout'),
+    path('auth/cache-stats/', views.AuthCacheStatsAPI.as_view(), name='auth-cache-stats'),
+
+    # Метрики
+    path('metrics/', views.MetricsAPI.as_view(), name='metrics-api'),
 ]
@@ -0,0 +1,40 @@
+import time
+
+from django.core.cache import caches
+
+# Версия пользователей: их имена (user__username) входят в списки студентов и преподавателей
+USERS_VERSION_KEY = 'users:version'
+
+
+def _shared_cache():
+    # Общий для процессов кэш (см. CACHES['shared'] в settings)
+    return caches['shared']
+
+
+def bump_version(key):
+    """Увеличивает номер версии key: все процессы увидят, что данные изменились"""
+    cache = _shared_cache()
+    # Если ключа нет (первый запуск или вытеснение), начинаем с уникального значения,
+    # чтобы оно не совпало со старой версией в каком-нибудь процессе
+    cache.add(key, time.time_ns(), timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def current_version(key):
+    cache = _shared_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_users_version():
+    bump_version(USERS_VERSION_KEY)
+
+
+def users_version():
+    return current_version(USERS_VERSION_KEY)
@@ -1,23 +1,26 @@
+import hmac
 import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
 from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.http import HttpResponse, JsonResponse, Http404, FileResponse
+from django.http import HttpResponse, JsonResponse, Http404, FileResponse, StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from .models import Student, Region, City, Teacher
 from .serializers import *
+from .authentication import user_cache
+from .metrics import registry as metrics_registry
+from .async_api import AsyncAPIView
+from .certificates import (
+    certificate_students, issue_certificates, aissue_certificates, certificate_filename,
+    render_certificate_pdf, arender_certificate_pdf, render_certificates_pdf, stream_certificates_zip,
+)
 
 
 class LoginAPI(APIView):
@@ -67,83 +70,110 @@ class LogoutAPI(APIView):
         return response
 
 
+class AuthCacheStatsAPI(APIView):
+    """Счетчики попаданий/промахов кэша пользователей JWT-аутентификации"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(user_cache.stats())
+
+
+class MetricsPermission(IsAdminUser):
+    """Администратор или сборщик метрик с токеном METRICS_TOKEN в заголовке X-Metrics-Token"""
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        # Сравнение за постоянное время: по времени ответа нельзя подбирать токен посимвольно
+        provided = request.headers.get('X-Metrics-Token', '')
+        if token and hmac.compare_digest(provided.encode(), token.encode()):
+            return True
+        return super().has_permission(request, view)
+
+
+class MetricsAPI(APIView):
+    """Сводные метрики запросов (RequestMetricsMiddleware) в текстовом формате Prometheus"""
+    permission_classes = [MetricsPermission]
+
+    def get(self, request):
+        return HttpResponse(
+            metrics_registry.render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
 class StudentCertificateAPI(APIView):
-    permission_classes = [AllowAny]
-    # Импортируем здесь
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    import os
-
-    # Регистрируем шрифты
-    font_path = "/app/app/fonts/Roboto-Regular.ttf"
-    bold_font_path = "/app/app/fonts/Roboto-Bold.ttf"
-
-    if os.path.exists(font_path):
-        pdfmetrics.registerFont(TTFont("Roboto-Regular", font_path))
-        pdfmetrics.registerFont(TTFont("Roboto-Bold", bold_font_path))
+    # Каждая справка получает номер из журнала, анонимный обход по pk расходовал бы номера
+    permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
         try:
-            student = Student.objects.select_related('group').get(pk=pk)
+            student = certificate_students(Student.objects).get(pk=pk)
         except Student.DoesNotExist:
             raise Http404('Студент не найден')
 
-        # Буфер в памяти для PDF
-        buffer = io.BytesIO()
-
-        # Создаем PDF
-        p = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-
-        x_left = 50
-        y_top = height - 80
-
-        p.setFont('Roboto-Bold', 16)
-        p.drawString(x_left, y_top, f'СПРАВКА № 44667 от {timezone.now().strftime("%d.%m.%Y")}')
-
-        p.setFont('Roboto-Regular', 12)
-        y = y_top - 40
-
-        full_name = student.__str__()
-        start_of_study = student.group.start_year
-        speciality = student.group.speciality
-        course = student.course
-        duration_display = student.group.qualification.duration_display
-
-        lines = [
-            f'Выдана {full_name}',
-            f'в том, что он в {start_of_study} году поступил, имея основное общее образование в ГАПОУ',
-            f'"Альметьевский политехнический техникум" по имеющей государственную',
-            f'аккредитацию образовательной программы среднего профессионального',
-            f'образования {speciality} от 11 ноября 2015 года (бессрочно в',
-            f'соответствии с ч.12 ст.92 ФЗ от 29.12.2012г. №273 ФЗ "Об образовании в РФ")',
-            f'выданную Министерством образования и науки Республики Татарстан.',
-            f'  В настоящее время обучается на {course} курсе по очной форме обучения, по',
-            f'специальности среднего профессионального образования {speciality}',
-            '',
-            f'  Срок получения образования по образовательной программе среднего',
-            f'профессионального образования по очной форме обучения {duration_display}',
-            f'Справка выдана для предоставления в военный комиссариат РТ,',
-            f'Лениногорский р-н с. Нижняя Чершила',
-        ]
-
-        for line in lines:
-            p.drawString(x_left, y, line)
-            y -= 20
-
-        # Подписи
-        y -= 40
-        p.drawString(x_left, y, "Руководитель _______________________")
-        y -= 20
-        p.drawString(x_left, y, "М.П.")
-
-        # Завершаем страницу и PDF
-        p.showPage()
-        p.save()
-
-        buffer.seek(0)
-
-        filename = f"spravka_student_{student.id}.pdf"
-        return FileResponse(buffer, as_attachment=True, filename=filename)
+        [context] = issue_certificates([student])
+        buffer = io.BytesIO(render_certificate_pdf(context))
+        return FileResponse(buffer, as_attachment=True, filename=certificate_filename(context))
+
+
+class AsyncStudentCertificateAPI(AsyncAPIView):
+    """
+    Async-вариант справки для ASGI: студент читается через async ORM,
+    PDF рисуется в пуле процессов, пока цикл событий обслуживает другие запросы.
+    """
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, pk):
+        try:
+            student = await certificate_students(Student.objects).aget(pk=pk)
+        except Student.DoesNotExist:
+            raise Http404('Студент не найден')
+
+        [context] = await aissue_certificates([student])
+        buffer = io.BytesIO(await arender_certificate_pdf(context))
+        return FileResponse(buffer, as_attachment=True, filename=certificate_filename(context))
+
+
+class StudentCertificatesBatchAPI(APIView):
+    """
+    Справки сразу для группы или списка студентов.
+    Параметры: group=<id> или ids=1,2,3; output=pdf (один общий файл) или output=zip.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        group_id = request.query_params.get('group')
+        ids = request.query_params.get('ids')
+        output = request.query_params.get('output', 'pdf')
+
+        if output not in ('pdf', 'zip'):
+            return Response({'error': 'Параметр output должен быть pdf или zip'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        students = certificate_students(Student.objects)
+        try:
+            if group_id:
+                # В имя файла - разобранное число: int() пропускает пробелы и переводы строк
+                group_id = int(group_id)
+                students = students.filter(group_id=group_id)
+                name = f'group_{group_id}'
+            elif ids:
+                students = students.filter(pk__in=[int(pk) for pk in ids.split(',') if pk.strip()])
+                name = 'students'
+            else:
+                return Response({'error': 'Укажите group или ids'}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'error': 'Идентификаторы должны быть целыми числами'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        contexts = issue_certificates(students)
+        if not contexts:
+            raise Http404('Студенты не найдены')
+
+        if output == 'zip':
+            response = StreamingHttpResponse(stream_certificates_zip(contexts), content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="spravki_{name}.zip"'
+            return response
+
+        buffer = io.BytesIO(render_certificates_pdf(contexts))
+        return FileResponse(buffer, as_attachment=True, filename=f'spravki_{name}.pdf')
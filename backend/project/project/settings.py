@@ -10,12 +10,21 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
 
@@ -36,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # pg_trgm: поиск по ФИО (app.search)
     'app',
     'corsheaders',
     'rest_framework',
@@ -45,13 +55,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.middleware.RequestMetricsMiddleware',  # кастомный, включается REQUEST_METRICS
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'app.middleware.ReplicaRoutingMiddleware',  # кастомный, чтение с реплик (DB_REPLICA_HOSTS)
     'app.middleware.JWTAuthenticationMiddleware',  # кастомный
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.middleware.AuditContextMiddleware',  # кастомный, автор изменений для BaseModel.save
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -72,9 +85,13 @@ CORS_ALLOWED_ORIGINS = [
     'http://127.0.0.1:5173',
 ]
 
+# Кэш пользователей для JWT-аутентификации (app.authentication.user_cache)
+JWT_USER_CACHE_SIZE = int(os.environ.get('JWT_USER_CACHE_SIZE', 1024))
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', 60))  # секунды
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'app.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -99,10 +116,19 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'project.project.wsgi.application'
+ASGI_APPLICATION = 'project.project.asgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Подключения к PostgreSQL (проверить при старте: manage.py wait_for_db):
+# - DB_CONN_MAX_AGE: сколько секунд держать подключение между запросами (0 - закрывать после каждого).
+#   Подключение живет в потоке воркера, поэтому под ASGI лучше пул: там потоки не переиспользуются.
+# - DB_CONN_HEALTH_CHECKS: проверять повторно используемое подключение перед запросом.
+# - DB_POOL: пул psycopg 3 (psycopg[pool]) на процесс вместо постоянных подключений,
+#   размер DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE, ожидание свободного подключения DB_POOL_TIMEOUT секунд.
+DB_POOL = env_flag('DB_POOL')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -111,7 +137,55 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', 'postgres'),
         'HOST': os.environ.get('DB_HOST', 'db'),
         'PORT': os.environ.get('DB_PORT', '5433'),
+        # С пулом подключения возвращаются в пул, постоянные подключения Django с ним несовместимы
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': env_flag('DB_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
+    }
+}
+
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+
+# Реплики только для чтения: DB_REPLICA_HOSTS=host1,host2:5434 -> алиасы replica1, replica2
+# с теми же базой и учетными данными, что и default. GET-запросы читают с них (app.db_routers),
+# после записи клиент READ_YOUR_WRITES_SECONDS секунд читает с основной базы.
+# В тестах реплики - зеркала default.
+REPLICA_DATABASES = []
+for number, address in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
     }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['app.db_routers.ReplicaRouter']
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+
+# Cache
+# Общий для всех процессов кэш: версия справочников (app.reference_data).
+# Файловый кэш работает без отдельного сервера; для нескольких хостов задайте
+# SHARED_CACHE_BACKEND/SHARED_CACHE_LOCATION (например, Redis или Memcached).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': os.environ.get('SHARED_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('SHARED_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'informationsystem_cache')),
+    },
 }
 
 # Password validation
@@ -149,5 +223,19 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Фоновая обработка фотографий (app.photos): потоков на процесс, 0 - только через manage.py process_photos
+PHOTO_WORKERS = int(os.environ.get('PHOTO_WORKERS', 2))
+
+# Процессов отрисовки справок для async-представлений (app.certificates.get_executor)
+CERTIFICATE_WORKERS = int(os.environ.get('CERTIFICATE_WORKERS', 2))
+
+# Процессов хеширования паролей при массовом зачислении (app.passwords.get_executor)
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+
+# Метрики запросов (app.metrics): Server-Timing и /api/metrics/ в формате Prometheus
+REQUEST_METRICS = env_flag('REQUEST_METRICS')
+# Токен для сборщика метрик (заголовок X-Metrics-Token); без него /api/metrics/ доступен только администраторам
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB